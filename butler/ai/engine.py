@@ -2,22 +2,66 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import json
 import logging
+import mimetypes
 import os
 import re
 from typing import Optional
 
 from pathlib import Path
 
-from .history import ConversationHistory
+from .history import ConversationHistory, normalize_content
 from .prompts import build_system_prompt
-from .tools import TOOL_DEFINITIONS, get_registry
+from .tools import TOOL_DEFINITIONS, get_registry, set_request_context
 
 logger = logging.getLogger(__name__)
 
 MAX_ITERATIONS = 10
 
+# Vision cost is ~width*height/750 tokens; images are downscaled to at most
+# ~1.15 megapixels, so this is the per-image upper bound
+IMAGE_TOKENS = 1600
+
+# Use absolute path so the daemon finds the right claude version
+CLAUDE_BIN = str(Path.home() / ".claude" / "local" / "claude")
+BUTLER_HOME = str(Path(__file__).parent.parent.parent)
+
+# A pre-spawned CLI process left unused this long is killed, so an idle
+# daemon doesn't keep Node (and the environment it started with) around
+CLI_SPARE_TTL = 600.0
+
+# At most this many summarizer CLI processes run at once, however many
+# conversations cross their token budget together
+SUMMARIZE_CONCURRENCY = 2
+_SUMMARIZE_POOL = asyncio.Semaphore(SUMMARIZE_CONCURRENCY)
+
+# ANSI colour/style escapes the CLI may emit; matched on raw stdout bytes
+_ANSI_RE = re.compile(rb"\x1b\[[0-9;]*m")
+
+# Messages made up only of greetings, thanks, goodbyes and similar small talk
+# are sent without the tool schema. Anything else may be a request to act on
+# the Mac, so it gets the tools. Words like "today" or "later" only count as
+# a tail after a greeting; on their own they may answer the model's question
+# ("When?" → "today") and need the tools to act on.
+_SMALL_TALK_RE = re.compile(
+    r"(?:(?:hi|hello|hey|hiya|howdy|yo|good\s*(?:morning|afternoon|evening|night|day)|"
+    r"thank\s+you|thanks?|thx|ty|cheers|much\s+appreciated|"
+    r"bye|goodbye|see\s+(?:you|ya)|gn|lol|lmao|haha\w*|"
+    r"how\s+are\s+(?:you|u)(?:\s+doing)?|how'?s\s+it\s+going|what'?s\s+up|sup|"
+    r"who\s+are\s+you|what\s+can\s+you\s+do)\b"
+    r"(?:[\s,]+(?:again|so\s+much|a\s+lot|very\s+much|there|buddy|mate|butler|"
+    r"today|tonight|later|soon)\b)*+[\W_]*+)++",
+    re.IGNORECASE,
+)
+# Longer messages are assumed to be tasks
+_CHAT_MAX_CHARS = 200
+
+# Transcript speaker prefixes for the CLI prompt
+_USER_LABEL = b"User: "
+_ASSISTANT_LABEL = b"Assistant: "
+
 
 class AIEngine:
     def __init__(
@@ -27,13 +71,30 @@ class AIEngine:
         max_tokens: int,
         history: ConversationHistory,
         cli_timeout: float = 3600,  # 1 hour default
+        max_concurrent: int = 4,
+        max_queued_per_sender: int = 3,
     ):
         self._api_key = api_key
         self._model = model
         self._max_tokens = max_tokens
         self._history = history
         self._cli_timeout = cli_timeout
-        self._system_prompt = build_system_prompt()
+        # Pre-spawned `claude --print` waiting on stdin, so a turn doesn't pay
+        # fork/exec + Node startup before the prompt can be sent. Only started
+        # once a CLI turn has run, and retired by _keep_spare after
+        # CLI_SPARE_TTL unused.
+        self._cli_spare: Optional[asyncio.subprocess.Process] = None
+        self._cli_spare_task: Optional[asyncio.Task] = None
+        self._cli_lock = asyncio.Lock()
+        # Fair scheduling: a sender may hold all but one of the global slots,
+        # so a busy user never leaves everyone else waiting behind them,
+        # while a lone user's requests still run in parallel.
+        self._global_sem = asyncio.Semaphore(max_concurrent)
+        self._sender_share = max(1, max_concurrent - 1)
+        self._sender_sems: dict[str, asyncio.Semaphore] = {}
+        # sender_id → turns running or waiting for a slot
+        self._sender_depth: dict[str, int] = {}
+        self._max_queued_per_sender = max_queued_per_sender
 
         if api_key:
             import anthropic
@@ -53,61 +114,109 @@ class AIEngine:
         recipient_id: str,
     ) -> str:
         """Process a user message and return the assistant reply."""
+        depth = self._sender_depth.get(sender_id, 0)
+        if depth >= self._sender_share + self._max_queued_per_sender:
+            logger.warning("Sender %s has %d requests in flight, rejecting", sender_id, depth)
+            return "⏳ I'm still working on your earlier requests. Please wait for those to finish."
 
-        # Build user content blocks
-        user_content: list[dict] = []
-        if text:
-            user_content.append({"type": "text", "text": text})
-        if media_path:
-            import mimetypes
-            mime, _ = mimetypes.guess_type(media_path)
-            if mime and mime.startswith("image/") and self._client:
-                # Image attachment only supported in API mode
-                try:
-                    import base64
-                    with open(media_path, "rb") as f:
-                        data = base64.standard_b64encode(f.read()).decode()
-                    user_content.append({
-                        "type": "image",
-                        "source": {"type": "base64", "media_type": mime, "data": data},
-                    })
-                except Exception as e:
-                    logger.warning("Could not attach image: %s", e)
-                    user_content.append({"type": "text", "text": f"[Attached file: {media_path}]"})
+        self._sender_depth[sender_id] = depth + 1
+        sem = self._sender_sems.setdefault(sender_id, asyncio.Semaphore(self._sender_share))
+        try:
+            async with sem, self._global_sem:
+                return await self._process(
+                    conv_id, text, media_path, sender_id, channel, recipient_id
+                )
+        finally:
+            remaining = self._sender_depth[sender_id] - 1
+            if remaining:
+                self._sender_depth[sender_id] = remaining
             else:
-                user_content.append({"type": "text", "text": f"[Attached file: {media_path}]"})
+                del self._sender_depth[sender_id]
+                self._sender_sems.pop(sender_id, None)
 
-        if not user_content:
-            user_content = [{"type": "text", "text": "(empty message)"}]
+    async def _process(
+        self,
+        conv_id: str,
+        text: str,
+        media_path: Optional[str],
+        sender_id: str,
+        channel: str,
+        recipient_id: str,
+    ) -> str:
+        """Run one turn once the sender has a processing slot."""
+        # Build user content blocks; plain text (the common case) skips the
+        # attachment handling entirely
+        if not media_path:
+            user_content = [{"type": "text", "text": text or "(empty message)"}]
+        else:
+            user_content = await self._attachment_content(text, media_path)
 
         # Persist user message
-        await self._history.append(conv_id, "user", user_content, tokens=_estimate_tokens(text))
+        await self._history.append(conv_id, "user", user_content, tokens=_estimate_tokens(user_content))
+
+        history = await self._history.load(
+            conv_id, sender_id, channel, summarize_fn=self._summarize_messages
+        )
 
         # Route: API (with full tool loop) or CLI (Claude Max)
         if self._client:
-            history = await self._history.load(
-                conv_id, sender_id, channel, summarize_fn=self._summarize_messages
+            response, response_tokens = await self._run_api(
+                conv_id, history, sender_id, channel, recipient_id
             )
-            response = await self._run_api(history, sender_id, channel, recipient_id)
         else:
-            history = await self._history.load(
-                conv_id, sender_id, channel, summarize_fn=self._summarize_messages
-            )
             response = await self._run_cli(history, text or "", sender_id, channel)
+            response_tokens = _estimate_tokens(response)
 
         # Persist assistant response
-        await self._history.append(conv_id, "assistant", response, tokens=_estimate_tokens(response))
+        await self._history.append(conv_id, "assistant", response, tokens=response_tokens)
         return response
 
+    async def _attachment_content(self, text: str, media_path: str) -> list[dict]:
+        """Build user content blocks for a message with a media attachment."""
+        user_content: list[dict] = []
+        if text:
+            user_content.append({"type": "text", "text": text})
+        mime, _ = mimetypes.guess_type(media_path)
+        if mime and mime.startswith("image/") and self._client:
+            # Image attachment only supported in API mode
+            try:
+                # Read off the event loop; base64 output is pure ASCII, so
+                # decode it as such rather than paying for UTF-8 validation
+                raw = await asyncio.to_thread(Path(media_path).read_bytes)
+                data = base64.b64encode(raw).decode("ascii")
+                del raw
+                user_content.append({
+                    "type": "image",
+                    "source": {"type": "base64", "media_type": mime, "data": data},
+                })
+            except Exception as e:
+                logger.warning("Could not attach image: %s", e)
+                user_content.append({"type": "text", "text": f"[Attached file: {media_path}]"})
+        else:
+            user_content.append({"type": "text", "text": f"[Attached file: {media_path}]"})
+        return user_content
+
     async def _run_api(
         self,
+        conv_id: str,
         messages: list[dict],
         sender_id: str,
         channel: str,
         recipient_id: str,
-    ) -> str:
-        """Run the agentic loop against the Claude API."""
+    ) -> tuple[str, int]:
+        """
+        Run the agentic loop against the Claude API.
+
+        Returns the reply text and its token count, taken from the API's usage
+        report for the final turn rather than estimated.
+        """
         registry = get_registry()
+        set_request_context(sender_id, channel, recipient_id)
+        # Plain chat skips the tool schema; without tools the model can only
+        # end its turn, so the loop runs once.
+        tool_kwargs = {"tools": TOOL_DEFINITIONS} if _needs_tools(messages) else {}
+        if not tool_kwargs:
+            logger.debug("Small talk, calling API without tools")
 
         for iteration in range(MAX_ITERATIONS):
             logger.debug("API iteration %d/%d", iteration + 1, MAX_ITERATIONS)
@@ -115,9 +224,9 @@ class AIEngine:
             resp = await self._client.messages.create(
                 model=self._model,
                 max_tokens=self._max_tokens,
-                system=self._system_prompt,
-                tools=TOOL_DEFINITIONS,
+                system=build_system_prompt(),
                 messages=messages,
+                **tool_kwargs,
             )
 
             # Collect text content from response
@@ -126,26 +235,37 @@ class AIEngine:
             ]
 
             if resp.stop_reason == "end_turn":
-                return "\n".join(text_parts) if text_parts else "(no response)"
+                text = "\n".join(text_parts) if text_parts else "(no response)"
+                return text, resp.usage.output_tokens
 
             if resp.stop_reason == "tool_use":
                 # Add assistant turn to messages
-                messages.append({"role": "assistant", "content": resp.content})
+                assistant_content = normalize_content(resp.content)
+                messages.append({"role": "assistant", "content": assistant_content})
+
+                # Read-only tool calls run concurrently, the rest in order —
+                # results come back in block order since the API needs one
+                # tool_result per tool_use_id
+                tool_blocks = [block for block in resp.content if block.type == "tool_use"]
+                for block in tool_blocks:
+                    logger.info("Tool call: %s(%s)", block.name, json.dumps(block.input)[:200])
+
+                results = await registry.dispatch_many(
+                    [(block.name, block.input) for block in tool_blocks]
+                )
 
-                # Execute all tool calls
                 tool_results = []
-                for block in resp.content:
-                    if block.type != "tool_use":
+                for block, result in zip(tool_blocks, results):
+                    if isinstance(result, BaseException):
+                        logger.warning("Tool %s raised: %s", block.name, result)
+                        tool_results.append({
+                            "type": "tool_result",
+                            "tool_use_id": block.id,
+                            "content": f"[error] {result}",
+                            "is_error": True,
+                        })
                         continue
-                    tool_name = block.name
-                    args = block.input
-                    logger.info("Tool call: %s(%s)", tool_name, json.dumps(args)[:200])
-
-                    result = await registry.dispatch(
-                        tool_name, args, sender_id, channel, recipient_id
-                    )
                     logger.debug("Tool result: %s…", str(result)[:200])
-
                     tool_results.append({
                         "type": "tool_result",
                         "tool_use_id": block.id,
@@ -153,19 +273,32 @@ class AIEngine:
                     })
 
                 messages.append({"role": "user", "content": tool_results})
+                # Persist the tool exchange so later turns can see what was done
+                await self._history.append_many(conv_id, [
+                    ("assistant", assistant_content, resp.usage.output_tokens),
+                    ("user", tool_results, _estimate_tokens(tool_results)),
+                ])
                 continue
 
             # max_tokens or other stop reasons
             text = "\n".join(text_parts)
             if resp.stop_reason == "max_tokens":
                 text += "\n…[response truncated]"
-            return text if text else "(no response)"
+            return (text if text else "(no response)"), resp.usage.output_tokens
+
+        text = "[Error] Maximum tool-use iterations reached. Please try a simpler request."
+        return text, _estimate_tokens(text)
 
-        return "[Error] Maximum tool-use iterations reached. Please try a simpler request."
+    async def _summarize_messages(self, messages: list[dict], previous_summary: str = "") -> str:
+        """
+        Fold a chunk of messages into the rolling summary via the CLI.
 
-    async def _summarize_messages(self, messages: list[dict]) -> str:
-        """Summarize a chunk of messages into a compact memory block via the CLI."""
+        Messages with role "summary" are partial summaries of later chunks to
+        merge in; they are passed whole, not truncated like conversation turns.
+        Raises on failure so the caller keeps the previous summary intact.
+        """
         lines = []
+        partials = []
         for msg in messages:
             role = msg.get("role", "?")
             content = msg.get("content", "")
@@ -173,34 +306,55 @@ class AIEngine:
                 text_parts = [b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"]
                 content = " ".join(text_parts)
             label = "User" if role == "user" else "Assistant"
-            if content:
+            if role == "summary":
+                partials.append(content)
+            elif content:
                 lines.append(f"{label}: {content[:400]}")
 
-        prompt = (
-            "Summarize this conversation chunk in 3-5 bullet points.\n"
-            "Focus on: tasks completed, important facts about the user or their system, key decisions.\n"
-            "Be very concise. Bullet points only.\n\n"
-            "Conversation:\n" + "\n".join(lines) + "\n\nSummary:"
-        )
+        if partials:
+            prompt = (
+                "Merge these summaries of consecutive parts of a conversation, oldest first,\n"
+                "into the running summary. At most 10 bullet points.\n"
+                "Focus on: tasks completed, important facts about the user or their system, key decisions.\n"
+                "Be very concise. Bullet points only.\n\n"
+                f"Running summary:\n{previous_summary or '(none yet)'}\n\n"
+                "Later parts:\n" + "\n\n".join(partials) + "\n\nMerged summary:"
+            )
+        elif previous_summary:
+            prompt = (
+                "Update this running summary of a conversation with the new messages below.\n"
+                "Keep what still matters from the previous summary; at most 10 bullet points.\n"
+                "Focus on: tasks completed, important facts about the user or their system, key decisions.\n"
+                "Be very concise. Bullet points only.\n\n"
+                f"Previous summary:\n{previous_summary}\n\n"
+                "New messages:\n" + "\n".join(lines) + "\n\nUpdated summary:"
+            )
+        else:
+            prompt = (
+                "Summarize this conversation chunk in 3-5 bullet points.\n"
+                "Focus on: tasks completed, important facts about the user or their system, key decisions.\n"
+                "Be very concise. Bullet points only.\n\n"
+                "Conversation:\n" + "\n".join(lines) + "\n\nSummary:"
+            )
 
-        env = os.environ.copy()
-        env.pop("CLAUDECODE", None)
-        claude_bin = str(Path.home() / ".claude" / "local" / "claude")
-        try:
+        async with _SUMMARIZE_POOL:
             proc = await asyncio.create_subprocess_exec(
-                claude_bin, "--print", "--output-format", "text",
+                CLAUDE_BIN, "--print", "--output-format", "text",
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                env=env,
+                env=_cli_env(),
             )
-            stdout, _ = await asyncio.wait_for(proc.communicate(input=prompt.encode()), timeout=60)
-            result = stdout.decode(errors="replace").strip()
-            result = re.sub(r"\x1b\[[0-9;]*m", "", result)
-            return result or "(summary unavailable)"
-        except Exception as e:
-            logger.warning("Summarization failed: %s", e)
-            return "(summary unavailable)"
+            try:
+                stdout, _ = await asyncio.wait_for(proc.communicate(input=prompt.encode()), timeout=60)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+        result = _ANSI_RE.sub(b"", stdout).decode(errors="replace").strip()
+        if not result:
+            raise RuntimeError("summarizer returned no output")
+        return result
 
     async def _run_cli(self, history: list[dict], current_text: str, sender_id: str = "", channel: str = "") -> str:
         """
@@ -212,7 +366,7 @@ class AIEngine:
         Claude Code's built-in tools (Bash, Read, Write, etc.) are available
         via --allowedTools, so the butler can still perform Mac actions.
         """
-        butler_home = str(Path(__file__).parent.parent.parent)
+        butler_home = BUTLER_HOME
         python_bin = str(Path(butler_home) / ".venv" / "bin" / "python")
         tools_cli = f"{python_bin} -m butler.tools_cli"
 
@@ -275,58 +429,49 @@ When a tool returns a file path (screenshot, browser_screenshot, generate_image)
 Always run these from the working directory: {butler_home}
 """
 
+        proc = None
         try:
             # Format conversation history as a readable transcript.
             # Keep last 20 messages for project continuity, but cap each
             # individual message at 2000 chars to avoid bloat from large
             # code dumps or file reads that inflate the prompt.
-            transcript_lines = [self._system_prompt, cli_tools_section, "--- Conversation so far ---"]
+            # The prompt is written straight into one byte buffer so it can
+            # be handed to stdin without a join + encode pass.
+            buf = bytearray()
+            buf += build_system_prompt().encode()
+            buf += b"\n"
+            buf += cli_tools_section.encode()
+            buf += b"\n--- Conversation so far ---\n"
             recent_history = history[:-1][-20:]  # at most 20 prior turns
             for msg in recent_history:
-                role = msg.get("role", "?")
                 content = msg.get("content", "")
                 if isinstance(content, list):
-                    text_parts = [
+                    content = " ".join(
                         b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"
-                    ]
-                    content = " ".join(text_parts)
-                label = "User" if role == "user" else "Assistant"
+                    )
                 if content:
                     if len(content) > 2000:
                         content = content[:2000] + "…[truncated]"
-                    transcript_lines.append(f"{label}: {content}")
-
-            transcript_lines.extend(["", "--- New message ---", f"User: {current_text}"])
-            full_prompt = "\n".join(transcript_lines)
+                    buf += _USER_LABEL if msg.get("role") == "user" else _ASSISTANT_LABEL
+                    buf += content.encode()
+                    buf += b"\n"
 
-            logger.debug("CLI prompt length: %d chars", len(full_prompt))
+            buf += b"\n--- New message ---\n"
+            buf += _USER_LABEL
+            buf += current_text.encode()
 
-            # Strip CLAUDECODE env var to allow nested invocation
-            env = os.environ.copy()
-            env.pop("CLAUDECODE", None)
+            logger.debug("CLI prompt length: %d bytes", len(buf))
 
-            # Use absolute path so the daemon finds the right claude version
-            claude_bin = str(Path.home() / ".claude" / "local" / "claude")
-
-            proc = await asyncio.create_subprocess_exec(
-                claude_bin,
-                "--print",
-                "--output-format", "text",
-                "--allowedTools",
-                "Bash,Read,Write,Edit,Glob,Grep",
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=butler_home,
-                env=env,
-            )
+            proc = await self._acquire_cli()
 
             stdout, stderr = await asyncio.wait_for(
-                proc.communicate(input=full_prompt.encode()),
+                proc.communicate(input=bytes(buf)),
                 timeout=self._cli_timeout,
             )
+            self._cli_spare_task = asyncio.create_task(self._keep_spare(), name="cli-spare")
 
-            output = stdout.decode(errors="replace").strip()
+            # Strip any residual ANSI escape codes before decoding
+            output = _ANSI_RE.sub(b"", stdout).decode(errors="replace").strip()
             err = stderr.decode(errors="replace").strip()
 
             if not output:
@@ -335,16 +480,16 @@ Always run these from the working directory: {butler_home}
                     return f"[CLI error] {err[:500]}"
                 return "(no response)"
 
-            # Strip any residual ANSI escape codes
-            output = re.sub(r"\x1b\[[0-9;]*m", "", output)
             return output
 
         except asyncio.TimeoutError:
+            if proc is not None:
+                await _discard(proc)
             mins = int(self._cli_timeout // 60)
             return f"⏰ Request timed out ({mins} min). The task may be too large — try breaking it into smaller steps."
         except FileNotFoundError:
             return (
-                f"❌ Claude CLI not found at {claude_bin}.\n"
+                f"❌ Claude CLI not found at {CLAUDE_BIN}.\n"
                 "Make sure Claude Code is installed: https://claude.ai/download\n"
                 "Or set anthropic.api_key in config/butler.yaml to use the API instead."
             )
@@ -352,9 +497,122 @@ Always run these from the working directory: {butler_home}
             logger.error("CLI execution error: %s", e, exc_info=True)
             return f"❌ CLI error: {e}"
 
+    async def _spawn_cli(self) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            CLAUDE_BIN,
+            "--print",
+            "--output-format", "text",
+            "--allowedTools",
+            "Bash,Read,Write,Edit,Glob,Grep",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=BUTLER_HOME,
+            env=_cli_env(),
+        )
+
+    async def _acquire_cli(self) -> asyncio.subprocess.Process:
+        """
+        Hand out the warm CLI process, or spawn one if there is none.
+
+        Each turn still gets a fresh process — the prompt carries the whole
+        transcript, so reusing one CLI session would duplicate context.
+        """
+        async with self._cli_lock:
+            if self._cli_spare_task:
+                # Its spare is being taken (or was never started); the next
+                # finished turn schedules a new one
+                self._cli_spare_task.cancel()
+                self._cli_spare_task = None
+            proc, self._cli_spare = self._cli_spare, None
+        if proc is None or proc.returncode is not None:
+            proc = await self._spawn_cli()
+        return proc
+
+    async def _keep_spare(self) -> None:
+        """Pre-spawn the next turn's CLI process; kill it after CLI_SPARE_TTL unused."""
+        async with self._cli_lock:
+            if self._cli_spare is not None:
+                return
+            try:
+                proc = await self._spawn_cli()
+            except Exception as e:
+                logger.debug("Could not pre-spawn CLI process: %s", e)
+                return
+            self._cli_spare = proc
+        await asyncio.sleep(CLI_SPARE_TTL)
+        if self._cli_spare is proc:
+            self._cli_spare = None
+            await _discard(proc)
+
+    async def close(self) -> None:
+        """Terminate the pre-spawned CLI process, if any."""
+        if self._cli_spare_task:
+            self._cli_spare_task.cancel()
+            self._cli_spare_task = None
+        proc, self._cli_spare = self._cli_spare, None
+        if proc:
+            await _discard(proc)
+
+
+async def _discard(proc: asyncio.subprocess.Process) -> None:
+    """Kill a CLI process (if still running) and reap it."""
+    if proc.returncode is None:
+        proc.kill()
+    await proc.wait()
+
+
+def _cli_env() -> dict[str, str]:
+    """Environment for the claude CLI (CLAUDECODE stripped to allow nested invocation)."""
+    env = os.environ.copy()
+    env.pop("CLAUDECODE", None)
+    return env
+
+
+def _needs_tools(messages: list[dict]) -> bool:
+    """
+    Cheap check for whether a turn should be offered the tools.
+
+    Only recognised small talk goes without them. Tools are always sent if
+    the history already holds tool blocks, since the API rejects
+    tool_use/tool_result content without tool definitions.
+    """
+    last = messages[-1]["content"] if messages else []
+    text = []
+    for b in last:
+        if b.get("type") != "text":
+            return True
+        text.append(b.get("text", ""))
+    text = " ".join(text).strip()
+    if len(text) > _CHAT_MAX_CHARS or not _SMALL_TALK_RE.fullmatch(text):
+        return True
+    return any(
+        isinstance(m["content"], list) and any(b.get("type") in ("tool_use", "tool_result") for b in m["content"])
+        for m in messages
+    )
+
 
 def _estimate_tokens(text: str | list) -> int:
-    """Rough token estimate (4 chars ≈ 1 token)."""
-    if isinstance(text, list):
-        text = json.dumps(text)
-    return max(1, len(text) // 4)
+    """Rough token estimate (4 chars ≈ 1 token).
+
+    For content-block lists, lengths are summed per block rather than over a
+    serialized copy. Images are billed by pixel area, not base64 size, so each
+    counts as IMAGE_TOKENS (the cost of a maximum-size image).
+    """
+    if not isinstance(text, list):
+        return max(1, len(text or "") // 4)
+    chars = 0
+    images = 0
+    for b in text:
+        if not isinstance(b, dict):
+            continue
+        kind = b.get("type")
+        if kind == "text":
+            chars += len(b.get("text", ""))
+        elif kind == "tool_result":
+            chars += len(str(b.get("content", "")))
+        elif kind == "tool_use":
+            chars += len(b.get("name", "")) + len(json.dumps(b.get("input", {})))
+        elif kind == "image":
+            images += 1
+    return max(1, chars // 4 + images * IMAGE_TOKENS)
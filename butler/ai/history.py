@@ -1,10 +1,12 @@
 """Conversation history with perpetual sessions, summarization, and user memory."""
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import time
 import uuid
+from collections import OrderedDict
 from typing import Optional, Callable, Awaitable
 
 import aiosqlite
@@ -14,8 +16,109 @@ logger = logging.getLogger(__name__)
 # Chunk size: summarize this many messages at a time when truncating
 SUMMARY_CHUNK_SIZE = 20
 
-# Type for the summarization callback
-SummarizeFn = Callable[[list[dict]], Awaitable[str]]
+# Max chunk summaries requested at once when several chunks are pending
+SUMMARY_CONCURRENCY = 5
+
+# After a summarization fails, evicted messages are dropped from context
+# instead of being held for the summary, and no new attempt is made for
+# this many seconds
+SUMMARY_RETRY_DELAY = 300.0
+
+# How long a pending write waits so concurrent turns share one commit
+COMMIT_DELAY = 0.02
+
+# Max message rows written by one batched INSERT
+WRITE_BATCH_SIZE = 64
+
+# Max conversations whose parsed history is kept in memory
+HISTORY_CACHE_SIZE = 64
+
+# messages.content_format: how the content column is stored
+FORMAT_TEXT = 0  # a lone text block, stored as the bare string
+FORMAT_JSON = 1  # anything else, as a JSON list of blocks
+
+# ── SQL ────────────────────────────────────────────────────────────────────
+# Kept as module constants so every call passes the identical string and hits
+# sqlite3's per-connection statement cache instead of re-preparing.
+
+# Touch-or-create in one statement (unique on channel, sender_id)
+_SQL_UPSERT_CONVERSATION = (
+    "INSERT INTO conversations (id, channel, sender_id, created_at, last_active) VALUES (?,?,?,?,?) "
+    "ON CONFLICT(channel, sender_id) DO UPDATE SET last_active=excluded.last_active "
+    "RETURNING id"
+)
+
+# Latest rolling summary (part 0) plus the user's memory rows (part 1)
+_SQL_LOAD_CONTEXT = (
+    "SELECT * FROM ("
+    " SELECT 0 AS part, content AS a, last_msg_id AS b, 0 AS ord FROM summaries"
+    " WHERE conversation_id=? ORDER BY last_msg_id DESC LIMIT 1"
+    ") UNION ALL "
+    "SELECT 1, key, value, updated_at FROM user_memory WHERE sender_id=? AND channel=? "
+    "ORDER BY part, ord DESC"
+)
+
+# Messages from the first row the budget window needs (see _load_messages)
+_SQL_LOAD_WINDOW = (
+    "WITH w AS ("
+    " SELECT id, tokens,"
+    "  ROW_NUMBER() OVER newest AS rn,"
+    "  SUM(tokens) OVER (newest ROWS UNBOUNDED PRECEDING) AS cum"
+    " FROM messages WHERE conversation_id=?"
+    " WINDOW newest AS (ORDER BY created_at DESC, id DESC)"
+    ") "
+    "SELECT id, role, content, tokens, kind, content_format FROM messages "
+    "WHERE conversation_id=? AND id >= ("
+    " SELECT COALESCE(MIN(id), 0) FROM w WHERE rn <= ? OR cum - tokens < ? OR id > ?"
+    ") ORDER BY created_at, id"
+)
+
+_SQL_LOAD_ALL = (
+    "SELECT id, role, content, tokens, kind, content_format FROM messages "
+    "WHERE conversation_id=? ORDER BY created_at, id"
+)
+_SQL_LOAD_STATS = "SELECT token_total, msg_count FROM conversation_stats WHERE conversation_id=?"
+_SQL_ADD_STATS = (
+    "INSERT INTO conversation_stats (conversation_id, token_total, msg_count) VALUES (?,?,?) "
+    "ON CONFLICT(conversation_id) DO UPDATE SET "
+    "token_total=token_total+excluded.token_total, msg_count=msg_count+excluded.msg_count"
+)
+
+# A range already stored (e.g. by a racing worker) is left as it is
+_SQL_INSERT_SUMMARY = (
+    "INSERT OR IGNORE INTO summaries (conversation_id, content, first_msg_id, last_msg_id, created_at) "
+    "VALUES (?,?,?,?,?)"
+)
+
+_SQL_SAVE_MEMORY = (
+    "INSERT OR REPLACE INTO user_memory (sender_id, channel, key, value, updated_at) VALUES (?,?,?,?,?)"
+)
+_SQL_DELETE_MEMORY = (
+    "DELETE FROM user_memory WHERE sender_id=? AND channel=? AND key=? RETURNING 1"
+)
+_SQL_LIST_MEMORIES = (
+    "SELECT key, value FROM user_memory WHERE sender_id=? AND channel=? ORDER BY updated_at DESC"
+)
+
+# Multi-row message insert, one string per batch size (1..WRITE_BATCH_SIZE
+# in practice) so those stay cached too
+_SQL_INSERT_MESSAGES: dict[int, str] = {}
+
+
+def _insert_messages_sql(n: int) -> str:
+    sql = _SQL_INSERT_MESSAGES.get(n)
+    if sql is None:
+        sql = _SQL_INSERT_MESSAGES[n] = (
+            "INSERT INTO messages (conversation_id, role, content, tokens, kind, content_format, created_at) "
+            "VALUES " + ",".join(["(?,?,?,?,?,?,?)"] * n) + " RETURNING id"
+        )
+    return sql
+
+
+# Type for the summarization callback: (new messages, previous summary) → updated summary.
+# When merging parallel chunk summaries, the "messages" are those partial
+# summaries instead, in order, each with role "summary" and string content.
+SummarizeFn = Callable[[list[dict], str], Awaitable[str]]
 
 
 class ConversationHistory:
@@ -28,30 +131,148 @@ class ConversationHistory:
         self._db = db
         self._token_budget = token_budget
         self._keep_recent = keep_recent
+        # Set when there are uncommitted writes; drained by _commit_loop
+        self._dirty = asyncio.Event()
+        self._commit_task: Optional[asyncio.Task] = None
+        # Message inserts from concurrent turns, coalesced by _writer_loop:
+        # (rows, future resolved with their ids once inserted)
+        self._write_q: asyncio.Queue[tuple[list[tuple], asyncio.Future]] = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        # conv_id → parsed messages (with id/_tokens), most recently used last
+        self._cache: OrderedDict[str, list[dict]] = OrderedDict()
+        # conv_id → count of completed appends, so a load() that raced one
+        # knows its rows may be stale and doesn't cache them
+        self._write_counts: dict[str, int] = {}
+        # conv_id → (latest summary, last message id it covers), and
+        # (sender_id, channel) → formatted memory block. Every write to
+        # summaries/user_memory goes through this class, which keeps these
+        # current, so a warm load() doesn't touch the database at all.
+        self._summary_cache: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._memory_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+        # conv_id → in-flight background summarization
+        self._summary_tasks: dict[str, asyncio.Task] = {}
+        # conv_id → time.monotonic() before which summarization isn't retried
+        self._summary_retry_at: dict[str, float] = {}
+
+    # ── Write batching ─────────────────────────────────────────────────────
+
+    def _mark_dirty(self) -> None:
+        """Schedule a commit for writes executed on the connection."""
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.create_task(self._commit_loop(), name="history-commit")
+        self._dirty.set()
+
+    async def _commit_loop(self) -> None:
+        """Coalesce bursts of writes into a single commit."""
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(COMMIT_DELAY)
+            self._dirty.clear()
+            try:
+                await self._db.commit()
+            except Exception as e:
+                logger.warning("History commit failed: %s", e)
 
-    async def get_or_create(self, channel: str, sender_id: str) -> str:
-        """Return the single perpetual conversation ID for this user (creates on first use)."""
+    async def _insert_messages(self, rows: list[tuple]) -> list[int]:
+        """Queue message rows for the batch writer; returns their ids once inserted."""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop(), name="history-writer")
+        fut = asyncio.get_running_loop().create_future()
+        self._write_q.put_nowait((rows, fut))
+        return await fut
+
+    async def _writer_loop(self) -> None:
+        """
+        Write queued messages in batches: everything queued while the previous
+        batch was being inserted (up to WRITE_BATCH_SIZE rows) goes in with one
+        statement. The commit is left to _commit_loop, so callers don't wait
+        for it.
+        """
+        while True:
+            batch = [await self._write_q.get()]
+            size = len(batch[0][0])
+            while size < WRITE_BATCH_SIZE and not self._write_q.empty():
+                item = self._write_q.get_nowait()
+                batch.append(item)
+                size += len(item[0])
+
+            try:
+                ids = await self._write_messages([row for rows, _ in batch for row in rows])
+            except Exception as e:
+                logger.warning("History write failed: %s", e)
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            else:
+                i = 0
+                for rows, fut in batch:
+                    if not fut.done():
+                        fut.set_result(ids[i: i + len(rows)])
+                    i += len(rows)
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+
+    async def _write_messages(self, rows: list[tuple]) -> list[int]:
+        """Insert message rows with one statement; returns ids in row order."""
+        # executemany can't report row ids, so this is one multi-row INSERT.
+        # Rows are inserted in VALUES order, so sorted ids line up with rows.
         async with self._db.execute(
-            "SELECT id FROM conversations WHERE channel=? AND sender_id=? "
-            "ORDER BY last_active DESC LIMIT 1",
-            (channel, sender_id),
+            _insert_messages_sql(len(rows)),
+            [value for row in rows for value in row],
         ) as cur:
-            row = await cur.fetchone()
+            ids = sorted(r[0] for r in await cur.fetchall())
+        # Committed together with the rows, so the totals never drift from the messages
+        totals: dict[str, list[int]] = {}
+        for row in rows:
+            t = totals.setdefault(row[0], [0, 0])
+            t[0] += row[3]
+            t[1] += 1
+        await self._db.executemany(
+            _SQL_ADD_STATS, [(conv_id, tokens, n) for conv_id, (tokens, n) in totals.items()]
+        )
+        # Rows are already visible on this connection; durability follows
+        # within COMMIT_DELAY (or at flush())
+        self._mark_dirty()
+        return ids
+
+    async def flush(self) -> None:
+        """Commit any pending writes immediately."""
+        await self._write_q.join()
+        self._dirty.clear()
+        await self._db.commit()
 
-        now = time.time()
-        if row:
-            conv_id = row["id"]
-            await self._db.execute(
-                "UPDATE conversations SET last_active=? WHERE id=?", (now, conv_id)
-            )
-        else:
-            conv_id = str(uuid.uuid4())
-            await self._db.execute(
-                "INSERT INTO conversations (id, channel, sender_id, created_at, last_active) VALUES (?,?,?,?,?)",
-                (conv_id, channel, sender_id, now, now),
-            )
+    async def close(self) -> None:
+        """Stop background tasks and flush outstanding writes."""
+        for task in list(self._summary_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._summary_tasks.values(), return_exceptions=True)
+        self._summary_tasks.clear()
+        await self._write_q.join()
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        if self._commit_task:
+            self._commit_task.cancel()
+            try:
+                await self._commit_task
+            except asyncio.CancelledError:
+                pass
+            self._commit_task = None
+        await self.flush()
 
-        await self._db.commit()
+    async def get_or_create(self, channel: str, sender_id: str) -> str:
+        """Return the single perpetual conversation ID for this user (creates on first use)."""
+        now = time.time()
+        async with self._db.execute(
+            _SQL_UPSERT_CONVERSATION, (str(uuid.uuid4()), channel, sender_id, now, now)
+        ) as cur:
+            conv_id = (await cur.fetchone())[0]
+        self._mark_dirty()
         return conv_id
 
     async def load(
@@ -64,168 +285,416 @@ class ConversationHistory:
         """
         Load message history for the API/prompt, with:
         - User memory injected at the top
-        - Past summaries injected after memory
+        - The rolling summary of older history injected after memory
         - Recent messages filling the remaining token budget
-        - Auto-summarization of messages being evicted (if summarize_fn provided)
+        - Auto-summarization of messages being evicted (if summarize_fn
+          provided), run in the background so this turn isn't held up
         """
-        # ── 1. Load user memory ────────────────────────────────────────────
-        memory_block = await self._load_user_memory(sender_id, channel) if sender_id else ""
-
-        # ── 2. Load existing summaries ────────────────────────────────────
-        async with self._db.execute(
-            "SELECT content FROM summaries WHERE conversation_id=? ORDER BY created_at",
-            (conv_id,),
-        ) as cur:
-            summary_rows = await cur.fetchall()
-        summaries_text = "\n\n".join(r["content"] for r in summary_rows)
+        # ── 1–2. Load user memory and the latest rolling summary ───────────
+        summary = _lru_get(self._summary_cache, conv_id)
+        memory_block = _lru_get(self._memory_cache, (sender_id, channel))
+        if summary is None or memory_block is None:
+            summary, memory_block = await self._load_context(conv_id, sender_id, channel)
+        summaries_text, covered_up_to = summary
 
         # ── 3. Load all messages ──────────────────────────────────────────
-        async with self._db.execute(
-            "SELECT id, role, content, tokens FROM messages WHERE conversation_id=? ORDER BY created_at",
-            (conv_id,),
-        ) as cur:
-            rows = await cur.fetchall()
-
-        all_messages = []
-        for row in rows:
-            content = json.loads(row["content"])
-            all_messages.append({
-                "id": row["id"],
-                "role": row["role"],
-                "content": content,
-                "_tokens": row["tokens"],
-            })
+        all_messages = await self._load_messages(conv_id, covered_up_to)
 
         if not all_messages:
             return _build_context(memory_block, summaries_text, [])
 
         # ── 4. Apply token budget ─────────────────────────────────────────
-        recent = all_messages[-self._keep_recent:]
-        older = all_messages[: -self._keep_recent]
-
-        recent_tokens = sum(m["_tokens"] for m in recent)
-        budget_remaining = self._token_budget - recent_tokens
-
-        kept_older = []
-        evicted = []
-        for msg in reversed(older):
-            if budget_remaining > 0:
-                kept_older.insert(0, msg)
-                budget_remaining -= msg["_tokens"]
-            else:
-                evicted.insert(0, msg)
-
-        # ── 5. Summarize evicted messages ─────────────────────────────────
-        if evicted and summarize_fn:
-            await self._summarize_and_store(conv_id, evicted, summarize_fn)
-            # Reload summaries after new ones were added
-            async with self._db.execute(
-                "SELECT content FROM summaries WHERE conversation_id=? ORDER BY created_at",
-                (conv_id,),
-            ) as cur:
-                summary_rows = await cur.fetchall()
-            summaries_text = "\n\n".join(r["content"] for r in summary_rows)
-
-        # ── 6. Strip internal ID field before returning ───────────────────
-        kept = kept_older + recent
-        for m in kept:
-            m.pop("id", None)
-            m.pop("_tokens", None)
+        split = max(len(all_messages) - self._keep_recent, 0)
+        cut = self._window_start([m["_tokens"] for m in all_messages])
+        evicted = all_messages[:cut]
+        kept_older = all_messages[cut:split]
+        recent = all_messages[split:]
+
+        # ── 5. Fold evicted messages into the rolling summary ─────────────
+        pending = [m for m in evicted if m["id"] > covered_up_to] if summarize_fn else []
+        if pending and time.monotonic() >= self._summary_retry_at.get(conv_id, 0.0):
+            # Evicted messages not yet summarized stay in context until the
+            # summary covers them, so nothing silently drops out of view. At
+            # most one chunk is held, so the prompt can't outgrow the budget
+            # by more than that while a summary is in flight. While backing
+            # off after a failure they are dropped, as any evicted row is.
+            kept_older = pending[-SUMMARY_CHUNK_SIZE:] + kept_older
+            if len(pending) >= SUMMARY_CHUNK_SIZE:
+                self._schedule_summary(conv_id, pending, summarize_fn, summaries_text, covered_up_to)
+
+        # Summarized messages are never read again; drop them from the cache
+        if evicted:
+            done = sum(1 for m in evicted if m["id"] <= covered_up_to)
+            del all_messages[:done]
+
+        # ── 6. Strip internal fields (entries are shared with the cache) ──
+        kept = [
+            {"role": m["role"], "content": m["content"]}
+            for m in _drop_broken_tool_turns(kept_older + recent)
+        ]
 
         return _build_context(memory_block, summaries_text, kept)
 
-    async def _summarize_and_store(
+    async def _load_context(
+        self, conv_id: str, sender_id: str, channel: str
+    ) -> tuple[tuple[str, int], str]:
+        """
+        Read the latest rolling summary and the memory block in one round-trip
+        and cache them. Each summary folds in the one before it, so only the
+        newest is used.
+        """
+        summaries_text, covered_up_to = "", 0
+        memories: dict[str, str] = {}
+        async with self._db.execute(_SQL_LOAD_CONTEXT, (conv_id, sender_id, channel)) as cur:
+            async for row in cur:
+                if row["part"] == 0:
+                    summaries_text, covered_up_to = row["a"], row["b"]
+                else:
+                    memories[row["a"]] = row["b"]
+        memory_block = _format_memory(memories)
+        _lru_put(self._summary_cache, conv_id, (summaries_text, covered_up_to))
+        _lru_put(self._memory_cache, (sender_id, channel), memory_block)
+        return (summaries_text, covered_up_to), memory_block
+
+    async def _load_messages(self, conv_id: str, covered_up_to: int) -> list[dict]:
+        """
+        Return the parsed message list for a conversation, via the LRU cache.
+
+        covered_up_to is the last message id folded into the stored summary.
+        """
+        cached = _lru_get(self._cache, conv_id)
+        if cached is not None:
+            return cached
+        writes = self._write_counts.get(conv_id, 0)
+
+        # When the whole conversation fits the budget (per the running totals
+        # in conversation_stats) every row is kept, so read them directly.
+        # Otherwise the window is decided inside SQLite: a running token sum
+        # over the conversation, newest first, finds the first row the window
+        # keeps (the same rule as _window_start). Only rows from there on, or
+        # not yet covered by a summary, are read back; older content never
+        # leaves the database.
+        async with self._db.execute(_SQL_LOAD_STATS, (conv_id,)) as cur:
+            stats = await cur.fetchone()
+        fits = stats is None or (
+            stats["msg_count"] <= self._keep_recent or stats["token_total"] < self._token_budget
+        )
+        if fits:
+            query, params = _SQL_LOAD_ALL, (conv_id,)
+        else:
+            query = _SQL_LOAD_WINDOW
+            params = (conv_id, conv_id, self._keep_recent, self._token_budget, covered_up_to)
+        async with self._db.execute(query, params) as cur:
+            # Decode rows as they arrive (aiosqlite fetches in chunks) rather
+            # than holding every raw row and the decoded list at once
+            messages = [
+                {
+                    "id": row["id"],
+                    "role": row["role"],
+                    "content": _decode_content(row["content_format"], row["content"]),
+                    "_tokens": row["tokens"],
+                    "_kind": row["kind"],
+                }
+                async for row in cur
+            ]
+        # An append that finished meanwhile found no cache entry to update,
+        # and its rows may be missing from this read; leave the next load()
+        # to read again rather than cache a list without them
+        if self._write_counts.get(conv_id, 0) == writes:
+            _lru_put(self._cache, conv_id, messages)
+        return messages
+
+    def _window_start(self, tokens: list[int]) -> int:
+        """
+        Index of the first message kept by the token budget.
+
+        The last keep_recent messages are always kept; older ones are kept,
+        newest first, while the budget they leave is still positive.
+        """
+        if len(tokens) <= self._keep_recent:
+            return 0
+        split = len(tokens) - self._keep_recent
+        budget_remaining = self._token_budget - sum(tokens[split:])
+        i = split
+        while i > 0 and budget_remaining > 0:
+            i -= 1
+            budget_remaining -= tokens[i]
+        return i
+
+    def _schedule_summary(
         self,
         conv_id: str,
-        messages: list[dict],
+        pending: list[dict],
         summarize_fn: SummarizeFn,
+        summary: str,
+        covered_up_to: int,
     ) -> None:
-        """Summarize evicted messages in chunks and store in DB."""
-        # Check which message IDs are already covered by existing summaries
-        async with self._db.execute(
-            "SELECT first_msg_id, last_msg_id FROM summaries WHERE conversation_id=?",
-            (conv_id,),
-        ) as cur:
-            covered = {(r["first_msg_id"], r["last_msg_id"]) for r in await cur.fetchall()}
+        """Fold pending messages into the summary in the background (one task per conversation)."""
+        task = self._summary_tasks.get(conv_id)
+        if task and not task.done():
+            return
 
-        # Process in chunks
-        for i in range(0, len(messages), SUMMARY_CHUNK_SIZE):
-            chunk = messages[i: i + SUMMARY_CHUNK_SIZE]
-            first_id = chunk[0]["id"]
-            last_id = chunk[-1]["id"]
+        async def _run() -> None:
+            try:
+                updated, covered = await self._summarize_and_store(
+                    conv_id, pending, summarize_fn, summary, covered_up_to
+                )
+                if covered == covered_up_to:
+                    # Nothing was folded in: the summarizer failed
+                    self._summary_retry_at[conv_id] = time.monotonic() + SUMMARY_RETRY_DELAY
+                    return
+                self._summary_retry_at.pop(conv_id, None)
+                _lru_put(self._summary_cache, conv_id, (updated, covered))
+                # Summarized messages are never read again; drop them from the cache
+                cached = self._cache.get(conv_id)
+                if cached:
+                    done = sum(1 for m in cached if m["id"] <= covered)
+                    del cached[:done]
+            finally:
+                self._summary_tasks.pop(conv_id, None)
+
+        self._summary_tasks[conv_id] = asyncio.create_task(_run(), name=f"summarize-{conv_id}")
 
-            # Skip if already summarized
-            if any(first_id >= f and last_id <= l for f, l in covered):
-                continue
+    async def _summarize_and_store(
+        self,
+        conv_id: str,
+        messages: list[dict],
+        summarize_fn: SummarizeFn,
+        summary: str,
+        covered_up_to: int,
+    ) -> tuple[str, int]:
+        """
+        Fold full chunks of not-yet-summarized messages into the rolling summary.
 
-            logger.info("Summarizing %d evicted messages (ids %d–%d)", len(chunk), first_id, last_id)
-            try:
-                summary = await summarize_fn(chunk)
-                await self._db.execute(
-                    "INSERT INTO summaries (conversation_id, content, first_msg_id, last_msg_id, created_at) "
-                    "VALUES (?,?,?,?,?)",
-                    (conv_id, summary, first_id, last_id, time.time()),
+        A single chunk is summarized together with the previous summary. When
+        several are pending, each is summarized on its own concurrently and the
+        partial summaries are then merged into the previous one in a final
+        call. Past history is never re-read. Returns the updated
+        (summary, covered_up_to).
+        """
+        pending = [m for m in messages if m["id"] > covered_up_to]
+
+        # Only whole chunks — a partial tail waits for more evictions
+        chunks = [
+            pending[i: i + SUMMARY_CHUNK_SIZE]
+            for i in range(0, len(pending) - SUMMARY_CHUNK_SIZE + 1, SUMMARY_CHUNK_SIZE)
+        ]
+        if not chunks:
+            return summary, covered_up_to
+
+        try:
+            if len(chunks) == 1:
+                logger.info(
+                    "Summarizing %d evicted messages (ids %d–%d)",
+                    len(chunks[0]), chunks[0][0]["id"], chunks[0][-1]["id"],
                 )
-                await self._db.commit()
-            except Exception as e:
-                logger.warning("Failed to summarize chunk: %s", e)
+                updated = await summarize_fn(chunks[0], summary)
+            else:
+                chunks, updated = await self._summarize_parallel(chunks, summarize_fn, summary)
+                if not chunks:
+                    return summary, covered_up_to
+
+            first_id = chunks[0][0]["id"]
+            last_id = chunks[-1][-1]["id"]
+            # One row per run, whatever the chunk count; committed with the
+            # next coalesced commit rather than on its own
+            await self._db.execute(
+                _SQL_INSERT_SUMMARY,
+                (conv_id, updated, first_id, last_id, time.time()),
+            )
+            self._mark_dirty()
+        except Exception as e:
+            logger.warning("Failed to summarize evicted messages: %s", e)
+            return summary, covered_up_to
+
+        return updated, last_id
+
+    async def _summarize_parallel(
+        self,
+        chunks: list[list[dict]],
+        summarize_fn: SummarizeFn,
+        summary: str,
+    ) -> tuple[list[list[dict]], str]:
+        """
+        Summarize chunks concurrently, then merge them into the rolling summary.
+
+        Returns the chunks actually covered (the run before the first failure,
+        so coverage stays contiguous) and the merged summary.
+        """
+        logger.info(
+            "Summarizing %d chunks of evicted messages (ids %d–%d)",
+            len(chunks), chunks[0][0]["id"], chunks[-1][-1]["id"],
+        )
+        sem = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+
+        async def _one(chunk: list[dict]) -> str:
+            async with sem:
+                return await summarize_fn(chunk, "")
+
+        results = await asyncio.gather(*(_one(c) for c in chunks), return_exceptions=True)
+
+        done: list[list[dict]] = []
+        partials: list[dict] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.warning("Failed to summarize chunk (ids %d–%d): %s", chunk[0]["id"], chunk[-1]["id"], result)
+                break
+            done.append(chunk)
+            partials.append({"role": "summary", "content": result})
+        if not done:
+            return [], summary
+
+        # Merge step: fold the partial summaries, in order, into the running one
+        return done, await summarize_fn(partials, summary)
 
     async def append(self, conv_id: str, role: str, content: list | str, tokens: int = 0) -> None:
         """Append a message to conversation history."""
-        if isinstance(content, str):
-            content_json = json.dumps([{"type": "text", "text": content}])
-        else:
-            content_json = json.dumps(content)
+        await self.append_many(conv_id, [(role, content, tokens)])
 
-        await self._db.execute(
-            "INSERT INTO messages (conversation_id, role, content, tokens, created_at) VALUES (?,?,?,?,?)",
-            (conv_id, role, content_json, tokens, time.time()),
-        )
-        await self._db.commit()
+    async def append_many(self, conv_id: str, turns: list[tuple[str, list | str, int]]) -> None:
+        """
+        Append several (role, content, tokens) turns together, e.g. a tool_use
+        turn and its tool_results. They are written in the same batch.
+        """
+        now = time.time()
+        entries = []
+        rows = []
+        for role, content, tokens in turns:
+            content = normalize_content(content)
+            kind = content_kind(content)
+            fmt, stored = _encode_content(content)
+            entries.append((role, content, tokens, kind))
+            rows.append((conv_id, role, stored, tokens, kind, fmt, now))
+
+        ids = await self._insert_messages(rows)
+        self._write_counts[conv_id] = self._write_counts.get(conv_id, 0) + 1
+
+        # Keep a cached history in step; a load() racing this insert may have
+        # already picked the rows up from the DB.
+        cached = self._cache.get(conv_id)
+        if cached is None:
+            return
+        for row_id, (role, content, tokens, kind) in zip(ids, entries):
+            if not cached or cached[-1]["id"] < row_id:
+                cached.append({
+                    "id": row_id, "role": role, "content": content, "_tokens": tokens, "_kind": kind,
+                })
+        self._cache.move_to_end(conv_id)
 
     # ── User memory ────────────────────────────────────────────────────────
 
     async def save_memory(self, sender_id: str, channel: str, key: str, value: str) -> None:
         """Store a memorable fact about the user."""
-        await self._db.execute(
-            "INSERT OR REPLACE INTO user_memory (sender_id, channel, key, value, updated_at) VALUES (?,?,?,?,?)",
-            (sender_id, channel, key.strip().lower(), value.strip(), time.time()),
-        )
-        await self._db.commit()
-        logger.info("Saved memory [%s/%s] %s = %s", channel, sender_id, key, value[:80])
+        k, v = key.strip().lower(), value.strip()
+        await self._db.execute(_SQL_SAVE_MEMORY, (sender_id, channel, k, v, time.time()))
+        self._mark_dirty()
+        self._memory_cache.pop((sender_id, channel), None)
+        logger.info("Saved memory [%s/%s] %s = %s", channel, sender_id, k, v[:80])
 
     async def forget_memory(self, sender_id: str, channel: str, key: str) -> bool:
         """Remove a remembered fact. Returns True if it existed."""
-        async with self._db.execute(
-            "SELECT id FROM user_memory WHERE sender_id=? AND channel=? AND key=?",
-            (sender_id, channel, key.strip().lower()),
-        ) as cur:
-            row = await cur.fetchone()
-        if row:
-            await self._db.execute(
-                "DELETE FROM user_memory WHERE sender_id=? AND channel=? AND key=?",
-                (sender_id, channel, key.strip().lower()),
-            )
-            await self._db.commit()
-            return True
-        return False
+        k = key.strip().lower()
+        async with self._db.execute(_SQL_DELETE_MEMORY, (sender_id, channel, k)) as cur:
+            found = await cur.fetchone() is not None
+        if found:
+            self._mark_dirty()
+            self._memory_cache.pop((sender_id, channel), None)
+        return found
 
     async def list_memories(self, sender_id: str, channel: str) -> dict[str, str]:
         """Return all remembered facts for a user."""
         async with self._db.execute(
-            "SELECT key, value FROM user_memory WHERE sender_id=? AND channel=? ORDER BY updated_at DESC",
+            _SQL_LIST_MEMORIES,
             (sender_id, channel),
         ) as cur:
-            rows = await cur.fetchall()
-        return {r["key"]: r["value"] for r in rows}
+            return {r["key"]: r["value"] async for r in cur}
+
+    async def memory_text(self, sender_id: str, channel: str) -> str:
+        """Remembered facts as "• key: value" lines (empty if none), via the memory cache."""
+        block = _lru_get(self._memory_cache, (sender_id, channel))
+        if block is None:
+            block = _format_memory(await self.list_memories(sender_id, channel))
+            _lru_put(self._memory_cache, (sender_id, channel), block)
+        return block[len(_MEMORY_HEADER):]
+
+
+def _lru_get(cache: OrderedDict, key):
+    """Return a cached value (None if absent), marking it most recently used."""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
 
-    async def _load_user_memory(self, sender_id: str, channel: str) -> str:
-        """Return a formatted memory block, or empty string if none."""
-        memories = await self.list_memories(sender_id, channel)
-        if not memories:
-            return ""
-        lines = [f"• {k}: {v}" for k, v in memories.items()]
-        return "Things I remember about you:\n" + "\n".join(lines)
+
+def _lru_put(cache: OrderedDict, key, value) -> None:
+    """Insert a value, evicting the least recently used beyond HISTORY_CACHE_SIZE."""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > HISTORY_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+_MEMORY_HEADER = "Things I remember about you:\n"
+
+
+def _format_memory(memories: dict[str, str]) -> str:
+    """Return a formatted memory block, or empty string if none."""
+    if not memories:
+        return ""
+    return _MEMORY_HEADER + "\n".join(f"• {k}: {v}" for k, v in memories.items())
+
+
+def normalize_content(content: list | str) -> list[dict]:
+    """
+    Return content as plain block dicts that survive a JSON round-trip.
+
+    A str becomes a single text block; SDK block objects (e.g. from
+    resp.content) are dumped to dicts.
+    """
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return [b.model_dump(exclude_none=True) if hasattr(b, "model_dump") else b for b in content]
+
+
+def _encode_content(blocks: list[dict]) -> tuple[int, str]:
+    """Return (content_format, stored text); plain text turns skip JSON."""
+    if len(blocks) == 1 and blocks[0].keys() == {"type", "text"} and blocks[0]["type"] == "text":
+        return FORMAT_TEXT, blocks[0]["text"]
+    return FORMAT_JSON, json.dumps(blocks)
+
+
+def _decode_content(fmt: int, stored: str) -> list[dict]:
+    if fmt == FORMAT_TEXT:
+        return [{"type": "text", "text": stored}]
+    return json.loads(stored)
+
+
+def content_kind(blocks: list[dict]) -> str:
+    """Classify a turn by its blocks: 'tool_use', 'tool_result' or 'text'."""
+    for b in blocks:
+        kind = b.get("type")
+        if kind in ("tool_use", "tool_result"):
+            return kind
+    return "text"
+
+
+def _drop_broken_tool_turns(messages: list[dict]) -> list[dict]:
+    """
+    Remove tool turns the API would reject: tool_result turns whose tool_use
+    was cut off by the window, and tool_use turns with no result after them
+    (e.g. the process stopped mid-loop).
+    """
+    out = []
+    for i, m in enumerate(messages):
+        kind = m.get("_kind", "text")
+        if kind == "tool_result" and not (out and out[-1].get("_kind") == "tool_use"):
+            continue
+        if kind == "tool_use" and not (
+            i + 1 < len(messages) and messages[i + 1].get("_kind") == "tool_result"
+        ):
+            continue
+        out.append(m)
+    return out
 
 
 def _build_context(memory_block: str, summaries_text: str, messages: list[dict]) -> list[dict]:
@@ -233,18 +702,16 @@ def _build_context(memory_block: str, summaries_text: str, messages: list[dict])
     Prepend memory + summaries as the first exchange in the message list.
     Uses a user→assistant ping-pong so the API format stays valid.
     """
-    context_parts = []
-    if memory_block:
-        context_parts.append(memory_block)
     if summaries_text:
-        context_parts.append("Summary of our past conversations:\n" + summaries_text)
-
-    if not context_parts:
+        summary_part = "Summary of our past conversations:\n" + summaries_text
+        context_text = f"{memory_block}\n\n{summary_part}" if memory_block else summary_part
+    elif memory_block:
+        context_text = memory_block
+    else:
         return messages
 
-    context_text = "\n\n".join(context_parts)
-    context_messages = [
+    return [
         {"role": "user", "content": [{"type": "text", "text": context_text}]},
         {"role": "assistant", "content": [{"type": "text", "text": "Got it — I have that context in mind."}]},
+        *messages,
     ]
-    return context_messages + messages
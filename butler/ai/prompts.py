@@ -1,17 +1,19 @@
 """System prompt for the AI butler."""
 import platform
 import os
+import time
 from datetime import datetime
 
+# Host details don't change while the daemon runs; look them up once
+_USER = os.environ.get("USER", "user")
+_HOSTNAME = platform.node()
+_MACOS = platform.mac_ver()[0]
 
-def build_system_prompt() -> str:
-    now = datetime.now().strftime("%A, %B %d, %Y at %H:%M")
-    hostname = platform.node()
-    macos = platform.mac_ver()[0]
-    user = os.environ.get("USER", "user")
+# The prompt is constant apart from the timestamp line between these two
+_PROMPT_HEAD = f"""You are a personal AI butler running on {_USER}'s Mac ({_HOSTNAME}, macOS {_MACOS}).
+Today is """
 
-    return f"""You are a personal AI butler running on {user}'s Mac ({hostname}, macOS {macos}).
-Today is {now}.
+_PROMPT_TAIL = """.
 
 ## Your Role
 You are a capable, concise assistant that can control the Mac on behalf of the user.
@@ -74,3 +76,15 @@ You have access to these tools:
 - Medium/high risk actions pause and ask the user via a permission prompt
 - You cannot override the permission system — always wait for user response
 """
+
+# (minute, prompt) — the timestamp only has minute precision
+_cached: tuple[int, str] = (-1, "")
+
+
+def build_system_prompt() -> str:
+    global _cached
+    minute = int(time.time() // 60)
+    if _cached[0] != minute:
+        now = datetime.now().strftime("%A, %B %d, %Y at %H:%M")
+        _cached = (minute, f"{_PROMPT_HEAD}{now}{_PROMPT_TAIL}")
+    return _cached[1]
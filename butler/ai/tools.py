@@ -1,10 +1,49 @@
 """Tool definitions (JSON schema) for Claude API tool_use + dispatcher."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import sys
+from contextvars import ContextVar
+from types import MappingProxyType
 from typing import Optional, Callable, Awaitable, Any
 
 from ..permissions.approval import ApprovalManager
+from ..tools.browser_tool import (
+    browser_click,
+    browser_get_text,
+    browser_navigate,
+    browser_screenshot,
+    browser_type,
+)
+from ..tools.image_tool import generate_image
+from ..tools.instagram_tool import (
+    instagram_comment,
+    instagram_follow,
+    instagram_get_feed,
+    instagram_get_messages,
+    instagram_get_notifications,
+    instagram_like,
+    instagram_post,
+    instagram_send_message,
+)
+from ..tools.linkedin_tool import (
+    linkedin_comment,
+    linkedin_connect,
+    linkedin_get_feed,
+    linkedin_get_messages,
+    linkedin_get_notifications,
+    linkedin_get_pages,
+    linkedin_page_post,
+    linkedin_post,
+    linkedin_send_message,
+)
+from ..tools.screenshot_tool import take_screenshot
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
 
 logger = logging.getLogger(__name__)
 
@@ -286,7 +325,7 @@ TOOL_DEFINITIONS = [
     },
     {
         "name": "instagram_like",
-        "description": "Like an Instagram post. Auto-approved (low risk).",
+        "description": "Like an Instagram post. Auto-approved (low risk) — the only social action that doesn't ask the user first.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -406,23 +445,221 @@ TOOL_DEFINITIONS = [
     },
 ]
 
+# Shared by every API request for the life of the process, so read-only:
+# a stray mutation would otherwise change the schema sent on every turn
+TOOL_DEFINITIONS = tuple(MappingProxyType(t) for t in TOOL_DEFINITIONS)
+
+
+# ─── Argument validation ──────────────────────────────────────────────────────
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+}
+
+
+def _basic_validator(schema: dict) -> Callable[[dict], Any]:
+    """Fallback when fastjsonschema isn't installed: required keys, types, enums."""
+    required = tuple(schema.get("required", ()))
+    checks = [
+        (name, _JSON_TYPES.get(prop.get("type")), prop.get("enum"))
+        for name, prop in schema.get("properties", {}).items()
+    ]
+
+    def validate(args: dict) -> dict:
+        if not isinstance(args, dict):
+            raise ValueError("arguments must be an object")
+        for name in required:
+            if name not in args:
+                raise ValueError(f"missing required argument '{name}'")
+        for name, types, enum in checks:
+            if name not in args:
+                continue
+            value = args[name]
+            # bool is an int subclass, but not a JSON integer/number
+            if types is not None and (
+                not isinstance(value, types) or (isinstance(value, bool) and types is not bool)
+            ):
+                raise ValueError(f"argument '{name}' must be of type {_type_name(types)}")
+            if enum is not None and value not in enum:
+                raise ValueError(f"argument '{name}' must be one of {enum}")
+        return args
+
+    return validate
+
+
+def _type_name(types) -> str:
+    return next(k for k, v in _JSON_TYPES.items() if v is types)
+
+
+def _compile_validator(schema: dict) -> Callable[[dict], Any]:
+    if fastjsonschema is not None:
+        return fastjsonschema.compile(schema)
+    return _basic_validator(schema)
+
+
+# Compiled once at import; both kinds raise ValueError subclasses on bad input
+_VALIDATORS: dict[str, Callable[[dict], Any]] = {
+    t["name"]: _compile_validator(t["input_schema"]) for t in TOOL_DEFINITIONS
+}
+
+
+# ─── Tool policy ──────────────────────────────────────────────────────────────
+# Per-tool behaviour the dispatcher looks up by name; checked against
+# TOOL_DEFINITIONS below so a renamed or removed tool can't be left behind.
+
+# Tools that may stop to ask the user for approval (the only ones handed an
+# approver); the wait for a reply doesn't count against their time limit
+_REQUIRES_APPROVAL = frozenset({
+    "bash",
+    "file_write",
+    "email_send",
+    "linkedin_connect",
+    "linkedin_comment",
+    "linkedin_send_message",
+    "linkedin_post",
+    "linkedin_page_post",
+    "instagram_follow",
+    "instagram_comment",
+    "instagram_send_message",
+    "instagram_post",
+})
+
+# Pure reads that need no approval and don't drive the shared browser page
+# (browser, LinkedIn and Instagram tools all do), so they may run side by side
+_CONCURRENCY_SAFE = frozenset({
+    "file_read",
+    "file_list",
+    "email_list",
+    "email_read",
+    "list_memories",
+})
+
+# Tools whose effect lands outside the Mac (a sent email, a post or message)
+# and may already have happened when the call times out, so the model is
+# told the outcome is unknown rather than that it failed
+_NOT_IDEMPOTENT = frozenset({
+    "email_send",
+    "linkedin_connect",
+    "linkedin_comment",
+    "linkedin_send_message",
+    "linkedin_post",
+    "linkedin_page_post",
+    "instagram_follow",
+    "instagram_comment",
+    "instagram_send_message",
+    "instagram_post",
+})
+
+# Time limit for a single tool call; slow tools get their own below
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+# Tools that send a file to the user, where the limit has to cover uploading
+# it to Telegram/WhatsApp (files up to 50 MB on a slow link)
+FILE_UPLOAD_TIMEOUT = 300.0
+
+_TOOL_TIMEOUTS: dict[str, float] = {
+    "file_send": FILE_UPLOAD_TIMEOUT,
+    "screenshot": FILE_UPLOAD_TIMEOUT,
+    "browser_screenshot": FILE_UPLOAD_TIMEOUT,
+    "browser_navigate": 45.0,
+    "email_list": 60.0,
+    # Above email_tool.SMTP_SEND_TIMEOUT, so the send gives up first
+    "email_send": 45.0,
+    "generate_image": 150.0,
+    **{t["name"]: 90.0 for t in TOOL_DEFINITIONS if t["name"].startswith(("linkedin_", "instagram_"))},
+}
+
+
+# Values for optional arguments the model left out, merged in by dispatch()
+_DEFAULTS: dict[str, dict[str, Any]] = {
+    "bash": {"timeout": 30.0},
+    "file_read": {"max_bytes": 100_000},
+    "file_list": {"show_hidden": False},
+    "browser_get_text": {"selector": "body"},
+    "screenshot": {"target": "desktop"},
+    "email_list": {"account": None, "count": 10, "folder": "INBOX"},
+    "email_read": {"account": None},
+    "email_send": {"account": None},
+    "linkedin_connect": {"message": ""},
+    "instagram_post": {"caption": ""},
+    "generate_image": {"aspect_ratio": "1:1", "style_preset": "", "negative_prompt": ""},
+}
+
+
+def _check_policy() -> None:
+    names = {t["name"] for t in TOOL_DEFINITIONS}
+    for label, tools in (
+        ("_REQUIRES_APPROVAL", _REQUIRES_APPROVAL),
+        ("_CONCURRENCY_SAFE", _CONCURRENCY_SAFE),
+        ("_NOT_IDEMPOTENT", _NOT_IDEMPOTENT),
+        ("_TOOL_TIMEOUTS", _TOOL_TIMEOUTS.keys()),
+        ("_DEFAULTS", _DEFAULTS.keys()),
+    ):
+        unknown = tools - names
+        if unknown:
+            raise RuntimeError(f"{label} names unknown tools: {sorted(unknown)}")
+    if _REQUIRES_APPROVAL & _CONCURRENCY_SAFE:
+        raise RuntimeError("A tool can't both require approval and be concurrency-safe")
+
+
+_check_policy()
+
+
+# Who the current turn is for; set once per turn by set_request_context and
+# inherited by every tool call the turn makes (each asyncio task copies it)
+_SENDER: ContextVar[str] = ContextVar("sender")
+_CHANNEL: ContextVar[str] = ContextVar("channel")
+_RECIPIENT: ContextVar[str] = ContextVar("recipient")
+
+
+def set_request_context(sender_id: str, channel: str, recipient_id: str) -> None:
+    """Bind the user a turn is for; tool calls in this task see it."""
+    _SENDER.set(sender_id)
+    _CHANNEL.set(channel)
+    _RECIPIENT.set(recipient_id)
+
 
 # ─── Tool dispatcher ──────────────────────────────────────────────────────────
 
 class ToolRegistry:
     """Holds tool implementations and dispatches calls."""
 
+    __slots__ = (
+        "_bash_fn",
+        "_file_read_fn",
+        "_file_write_fn",
+        "_file_list_fn",
+        "_browser_cfg",
+        "_email_tools",
+        "_default_email_tool",
+        "_send_file_to_user",
+        "_approver_factory",
+        "_history",
+        "_stability_api_key",
+        "_handlers",
+    )
+
     def __init__(self):
         self._bash_fn = None
         self._file_read_fn = None
         self._file_write_fn = None
         self._file_list_fn = None
-        self._browser_cfg: dict = {}
+        self._browser_cfg: MappingProxyType = MappingProxyType({})
         self._email_tools: dict = {}   # account_name → EmailTool
+        self._default_email_tool = None   # first configured account
         self._send_file_to_user: Optional[Callable] = None
         self._approver_factory: Optional[Callable] = None
         self._history = None   # ConversationHistory instance for memory tools
         self._stability_api_key: str = ""
+        # tool name → handler, so dispatch is one lookup
+        self._handlers: dict[str, Callable[..., Awaitable[str]]] = {
+            t["name"]: getattr(self, f"_h_{t['name']}") for t in TOOL_DEFINITIONS
+        }
 
     def set_stability_key(self, api_key: str) -> None:
         self._stability_api_key = api_key
@@ -443,7 +680,9 @@ class ToolRegistry:
         self._file_read_fn = file_read_fn
         self._file_write_fn = file_write_fn
         self._file_list_fn = file_list_fn
-        self._browser_cfg = browser_cfg
+        # Splatted into every browser call; a private read-only copy so the
+        # caller's dict can't change it afterwards
+        self._browser_cfg = MappingProxyType(dict(browser_cfg))
         # Accept both dict (multi-account) and single EmailTool (legacy)
         if isinstance(email_tools, dict):
             self._email_tools = email_tools
@@ -451,239 +690,270 @@ class ToolRegistry:
             self._email_tools = {"default": email_tools}
         else:
             self._email_tools = {}
+        self._default_email_tool = next(iter(self._email_tools.values()), None)
         self._send_file_to_user = send_file_to_user
         self._approver_factory = approver_factory
 
     def _get_email_tool(self, account: Optional[str] = None):
         """Return the EmailTool for the given account name, or the default."""
-        if not self._email_tools:
-            return None
-        if account and account in self._email_tools:
-            return self._email_tools[account]
-        return next(iter(self._email_tools.values()))
+        if account:
+            et = self._email_tools.get(account)
+            if et is not None:
+                return et
+        return self._default_email_tool
 
     def set_history(self, history) -> None:
         self._history = history
 
-    async def dispatch(
-        self,
-        tool_name: str,
-        args: dict,
-        sender_id: str,
-        channel: str,
-        recipient_id: str,
-    ) -> str:
-        approver: Optional[ApprovalManager] = None
-        if self._approver_factory:
-            approver = self._approver_factory(sender_id)
-
-        bk = self._browser_cfg
-
-        if tool_name == "bash":
-            return await self._bash_fn(
-                args["command"],
-                approver,
-                timeout=args.get("timeout", 30.0),
-            )
-
-        elif tool_name == "file_read":
-            return await self._file_read_fn(
-                args["path"],
-                max_bytes=args.get("max_bytes", 100_000),
-            )
-
-        elif tool_name == "file_write":
-            return await self._file_write_fn(
-                args["path"],
-                args["content"],
-                approver,
-            )
-
-        elif tool_name == "file_list":
-            return await self._file_list_fn(
-                args["directory"],
-                show_hidden=args.get("show_hidden", False),
-            )
-
-        elif tool_name == "file_send":
-            path = args["path"]
-            await self._send_file_to_user(recipient_id, path, channel)
-            return f"[OK] Sent {path} to user"
-
-        elif tool_name == "browser_navigate":
-            from ..tools.browser_tool import browser_navigate
-            return await browser_navigate(args["url"], **bk)
-
-        elif tool_name == "browser_click":
-            from ..tools.browser_tool import browser_click
-            return await browser_click(args["selector"], **bk)
-
-        elif tool_name == "browser_type":
-            from ..tools.browser_tool import browser_type
-            return await browser_type(args["selector"], args["text"], **bk)
-
-        elif tool_name == "browser_get_text":
-            from ..tools.browser_tool import browser_get_text
-            return await browser_get_text(args.get("selector", "body"), **bk)
-
-        elif tool_name == "browser_screenshot":
-            from ..tools.browser_tool import browser_screenshot
-            path = await browser_screenshot(**bk)
-            if not path.startswith("[ERROR]"):
-                await self._send_file_to_user(recipient_id, path, channel)
-                return f"[OK] Screenshot sent"
-            return path
-
-        elif tool_name == "screenshot":
-            from ..tools.screenshot_tool import take_screenshot
-            target = args.get("target", "desktop")
-            path = await take_screenshot(target=target, browser_kwargs=bk)
-            if not path.startswith("[ERROR]"):
-                await self._send_file_to_user(recipient_id, path, channel)
-                return f"[OK] {target} screenshot sent"
-            return path
-
-        elif tool_name == "email_list":
-            et = self._get_email_tool(args.get("account"))
-            if not et:
-                return "[ERROR] Email not configured"
-            return await et.list_emails(
-                count=args.get("count", 10),
-                folder=args.get("folder", "INBOX"),
-            )
-
-        elif tool_name == "email_read":
-            et = self._get_email_tool(args.get("account"))
-            if not et:
-                return "[ERROR] Email not configured"
-            return await et.read_email(args["message_id"])
-
-        elif tool_name == "email_send":
-            et = self._get_email_tool(args.get("account"))
-            if not et:
-                return "[ERROR] Email not configured"
-            return await et.send_email(
-                args["to"], args["subject"], args["body"], approver
-            )
-
-        elif tool_name == "linkedin_get_feed":
-            from ..tools.linkedin_tool import linkedin_get_feed
-            return await linkedin_get_feed(**bk)
-
-        elif tool_name == "linkedin_get_notifications":
-            from ..tools.linkedin_tool import linkedin_get_notifications
-            return await linkedin_get_notifications(**bk)
-
-        elif tool_name == "linkedin_get_messages":
-            from ..tools.linkedin_tool import linkedin_get_messages
-            return await linkedin_get_messages(**bk)
-
-        elif tool_name == "linkedin_get_pages":
-            from ..tools.linkedin_tool import linkedin_get_pages
-            return await linkedin_get_pages(**bk)
-
-        elif tool_name == "linkedin_connect":
-            from ..tools.linkedin_tool import linkedin_connect
-            return await linkedin_connect(
-                args["profile_url"], args.get("message", ""), approver=approver, **bk
-            )
-
-        elif tool_name == "linkedin_comment":
-            from ..tools.linkedin_tool import linkedin_comment
-            return await linkedin_comment(
-                args["post_url"], args["text"], approver=approver, **bk
-            )
-
-        elif tool_name == "linkedin_send_message":
-            from ..tools.linkedin_tool import linkedin_send_message
-            return await linkedin_send_message(
-                args["recipient"], args["text"], approver=approver, **bk
-            )
-
-        elif tool_name == "linkedin_post":
-            from ..tools.linkedin_tool import linkedin_post
-            return await linkedin_post(args["text"], approver=approver, **bk)
-
-        elif tool_name == "linkedin_page_post":
-            from ..tools.linkedin_tool import linkedin_page_post
-            return await linkedin_page_post(
-                args["page_name"], args["text"], approver=approver, **bk
-            )
-
-        elif tool_name == "instagram_get_feed":
-            from ..tools.instagram_tool import instagram_get_feed
-            return await instagram_get_feed(**bk)
-
-        elif tool_name == "instagram_get_notifications":
-            from ..tools.instagram_tool import instagram_get_notifications
-            return await instagram_get_notifications(**bk)
-
-        elif tool_name == "instagram_get_messages":
-            from ..tools.instagram_tool import instagram_get_messages
-            return await instagram_get_messages(**bk)
-
-        elif tool_name == "instagram_follow":
-            from ..tools.instagram_tool import instagram_follow
-            return await instagram_follow(args["profile_url"], approver=approver, **bk)
+    async def dispatch(self, tool_name: str, args: dict) -> str:
+        """Run one tool call for the user bound by set_request_context."""
+        # Names decoded from the API response are fresh strings; interned,
+        # the handler-table lookup matches the literal keys by identity
+        tool_name = sys.intern(tool_name)
+        handler = self._handlers.get(tool_name)
+        if handler is None:
+            return f"[ERROR] Unknown tool: {tool_name}"
 
-        elif tool_name == "instagram_like":
-            from ..tools.instagram_tool import instagram_like
-            return await instagram_like(args["post_url"], approver=approver, **bk)
+        # Reject malformed arguments up front instead of failing mid-handler
+        try:
+            _VALIDATORS[tool_name](args)
+        except ValueError as e:
+            return f"[ERROR] Invalid arguments for {tool_name}: {e}"
+        defaults = _DEFAULTS.get(tool_name)
+        if defaults:
+            args = {**defaults, **args}
 
-        elif tool_name == "instagram_comment":
-            from ..tools.instagram_tool import instagram_comment
-            return await instagram_comment(
-                args["post_url"], args["text"], approver=approver, **bk
-            )
+        # Only tools that can prompt need the sender's approver
+        approver: Optional[ApprovalManager] = None
+        if self._approver_factory and tool_name in _REQUIRES_APPROVAL:
+            approver = self._approver_factory(_SENDER.get())
 
-        elif tool_name == "instagram_send_message":
-            from ..tools.instagram_tool import instagram_send_message
-            return await instagram_send_message(
-                args["recipient"], args["text"], approver=approver, **bk
-            )
+        # bash enforces its own timeout and reports it; this is only a backstop
+        if tool_name == "bash":
+            timeout = args["timeout"] + 5.0
+        else:
+            timeout = _TOOL_TIMEOUTS.get(tool_name, DEFAULT_TOOL_TIMEOUT)
+        if approver:
+            timeout += approver.timeout
 
-        elif tool_name == "instagram_post":
-            from ..tools.instagram_tool import instagram_post
-            return await instagram_post(
-                args["image_path"], args.get("caption", ""), approver=approver, **bk
+        try:
+            return await asyncio.wait_for(
+                handler(args, approver), timeout
             )
-
-        elif tool_name == "remember":
-            if not self._history:
-                return "[ERROR] Memory not available"
-            await self._history.save_memory(sender_id, channel, args["key"], args["value"])
-            return f"✅ Remembered: {args['key']} = {args['value']}"
-
-        elif tool_name == "forget":
-            if not self._history:
-                return "[ERROR] Memory not available"
-            removed = await self._history.forget_memory(sender_id, channel, args["key"])
-            return f"✅ Forgotten: {args['key']}" if removed else f"Nothing stored under '{args['key']}'"
-
-        elif tool_name == "list_memories":
-            if not self._history:
-                return "[ERROR] Memory not available"
-            memories = await self._history.list_memories(sender_id, channel)
-            if not memories:
-                return "No memories stored yet."
-            return "\n".join(f"• {k}: {v}" for k, v in memories.items())
-
-        elif tool_name == "generate_image":
-            from ..tools.image_tool import generate_image
-            path = await generate_image(
-                args["prompt"],
-                aspect_ratio=args.get("aspect_ratio", "1:1"),
-                style_preset=args.get("style_preset", ""),
-                negative_prompt=args.get("negative_prompt", ""),
-                api_key=self._stability_api_key,
+        except asyncio.TimeoutError:
+            logger.warning("Tool %s timed out after %gs", tool_name, timeout)
+            if tool_name in _NOT_IDEMPOTENT:
+                return (
+                    f"[UNKNOWN] {tool_name} timed out after {timeout:g}s and may still have "
+                    "completed. Check before retrying so it isn't done twice."
+                )
+            return f"[ERROR] {tool_name} timed out after {timeout:g}s"
+
+    async def dispatch_many(self, calls: list[tuple[str, dict]]) -> list:
+        """
+        Run several (tool_name, args) calls; returns their results, or the
+        exceptions they raised, in call order.
+
+        Consecutive concurrency-safe calls run together. Any other call runs
+        alone, after everything before it, so reads never overtake a write
+        (or an approval prompt) that was issued ahead of them.
+        """
+        results: list = []
+        i = 0
+        while i < len(calls):
+            j = i + 1
+            if calls[i][0] in _CONCURRENCY_SAFE:
+                while j < len(calls) and calls[j][0] in _CONCURRENCY_SAFE:
+                    j += 1
+            results += await asyncio.gather(
+                *(self.dispatch(name, args) for name, args in calls[i:j]),
+                return_exceptions=True,
             )
-            if not path.startswith("[ERROR]"):
-                await self._send_file_to_user(recipient_id, path, channel)
-                return f"[OK] Image generated and sent"
-            return path
-
-        else:
-            return f"[ERROR] Unknown tool: {tool_name}"
+            i = j
+        return results
+
+    # ── Handlers: (args, approver) → result; the user comes from _SENDER etc. ──
+
+    async def _h_bash(self, args, approver) -> str:
+        return await self._bash_fn(
+            args["command"],
+            approver,
+            timeout=args["timeout"],
+        )
+
+    async def _h_file_read(self, args, approver) -> str:
+        return await self._file_read_fn(
+            args["path"],
+            max_bytes=args["max_bytes"],
+        )
+
+    async def _h_file_write(self, args, approver) -> str:
+        return await self._file_write_fn(
+            args["path"],
+            args["content"],
+            approver,
+        )
+
+    async def _h_file_list(self, args, approver) -> str:
+        return await self._file_list_fn(
+            args["directory"],
+            show_hidden=args["show_hidden"],
+        )
+
+    async def _h_file_send(self, args, approver) -> str:
+        path = args["path"]
+        await self._send_file_to_user(_RECIPIENT.get(), path, _CHANNEL.get())
+        return f"[OK] Sent {path} to user"
+
+    async def _h_browser_navigate(self, args, approver) -> str:
+        return await browser_navigate(args["url"], **self._browser_cfg)
+
+    async def _h_browser_click(self, args, approver) -> str:
+        return await browser_click(args["selector"], **self._browser_cfg)
+
+    async def _h_browser_type(self, args, approver) -> str:
+        return await browser_type(args["selector"], args["text"], **self._browser_cfg)
+
+    async def _h_browser_get_text(self, args, approver) -> str:
+        return await browser_get_text(args["selector"], **self._browser_cfg)
+
+    async def _h_browser_screenshot(self, args, approver) -> str:
+        path = await browser_screenshot(**self._browser_cfg)
+        if not path.startswith("[ERROR]"):
+            await self._send_file_to_user(_RECIPIENT.get(), path, _CHANNEL.get())
+            return f"[OK] Screenshot sent"
+        return path
+
+    async def _h_screenshot(self, args, approver) -> str:
+        target = args["target"]
+        path = await take_screenshot(target=target, browser_kwargs=self._browser_cfg)
+        if not path.startswith("[ERROR]"):
+            await self._send_file_to_user(_RECIPIENT.get(), path, _CHANNEL.get())
+            return f"[OK] {target} screenshot sent"
+        return path
+
+    async def _h_email_list(self, args, approver) -> str:
+        et = self._get_email_tool(args["account"])
+        if not et:
+            return "[ERROR] Email not configured"
+        return await et.list_emails(
+            count=args["count"],
+            folder=args["folder"],
+        )
+
+    async def _h_email_read(self, args, approver) -> str:
+        et = self._get_email_tool(args["account"])
+        if not et:
+            return "[ERROR] Email not configured"
+        return await et.read_email(args["message_id"])
+
+    async def _h_email_send(self, args, approver) -> str:
+        et = self._get_email_tool(args["account"])
+        if not et:
+            return "[ERROR] Email not configured"
+        return await et.send_email(
+            args["to"], args["subject"], args["body"], approver
+        )
+
+    async def _h_linkedin_get_feed(self, args, approver) -> str:
+        return await linkedin_get_feed(**self._browser_cfg)
+
+    async def _h_linkedin_get_notifications(self, args, approver) -> str:
+        return await linkedin_get_notifications(**self._browser_cfg)
+
+    async def _h_linkedin_get_messages(self, args, approver) -> str:
+        return await linkedin_get_messages(**self._browser_cfg)
+
+    async def _h_linkedin_get_pages(self, args, approver) -> str:
+        return await linkedin_get_pages(**self._browser_cfg)
+
+    async def _h_linkedin_connect(self, args, approver) -> str:
+        return await linkedin_connect(
+            args["profile_url"], args["message"], approver=approver, **self._browser_cfg
+        )
+
+    async def _h_linkedin_comment(self, args, approver) -> str:
+        return await linkedin_comment(
+            args["post_url"], args["text"], approver=approver, **self._browser_cfg
+        )
+
+    async def _h_linkedin_send_message(self, args, approver) -> str:
+        return await linkedin_send_message(
+            args["recipient"], args["text"], approver=approver, **self._browser_cfg
+        )
+
+    async def _h_linkedin_post(self, args, approver) -> str:
+        return await linkedin_post(args["text"], approver=approver, **self._browser_cfg)
+
+    async def _h_linkedin_page_post(self, args, approver) -> str:
+        return await linkedin_page_post(
+            args["page_name"], args["text"], approver=approver, **self._browser_cfg
+        )
+
+    async def _h_instagram_get_feed(self, args, approver) -> str:
+        return await instagram_get_feed(**self._browser_cfg)
+
+    async def _h_instagram_get_notifications(self, args, approver) -> str:
+        return await instagram_get_notifications(**self._browser_cfg)
+
+    async def _h_instagram_get_messages(self, args, approver) -> str:
+        return await instagram_get_messages(**self._browser_cfg)
+
+    async def _h_instagram_follow(self, args, approver) -> str:
+        return await instagram_follow(args["profile_url"], approver=approver, **self._browser_cfg)
+
+    async def _h_instagram_like(self, args, approver) -> str:
+        # Low risk: never asks for approval
+        return await instagram_like(args["post_url"], **self._browser_cfg)
+
+    async def _h_instagram_comment(self, args, approver) -> str:
+        return await instagram_comment(
+            args["post_url"], args["text"], approver=approver, **self._browser_cfg
+        )
+
+    async def _h_instagram_send_message(self, args, approver) -> str:
+        return await instagram_send_message(
+            args["recipient"], args["text"], approver=approver, **self._browser_cfg
+        )
+
+    async def _h_instagram_post(self, args, approver) -> str:
+        return await instagram_post(
+            args["image_path"], args["caption"], approver=approver, **self._browser_cfg
+        )
+
+    async def _h_remember(self, args, approver) -> str:
+        if not self._history:
+            return "[ERROR] Memory not available"
+        sender_id, channel = _SENDER.get(), _CHANNEL.get()
+        await self._history.save_memory(sender_id, channel, args["key"], args["value"])
+        return f"✅ Remembered: {args['key']} = {args['value']}"
+
+    async def _h_forget(self, args, approver) -> str:
+        if not self._history:
+            return "[ERROR] Memory not available"
+        sender_id, channel = _SENDER.get(), _CHANNEL.get()
+        removed = await self._history.forget_memory(sender_id, channel, args["key"])
+        return f"✅ Forgotten: {args['key']}" if removed else f"Nothing stored under '{args['key']}'"
+
+    async def _h_list_memories(self, args, approver) -> str:
+        if not self._history:
+            return "[ERROR] Memory not available"
+        sender_id, channel = _SENDER.get(), _CHANNEL.get()
+        # Same lines as the memory block injected into the prompt, so usually cached
+        return await self._history.memory_text(sender_id, channel) or "No memories stored yet."
+
+    async def _h_generate_image(self, args, approver) -> str:
+        path = await generate_image(
+            args["prompt"],
+            aspect_ratio=args["aspect_ratio"],
+            style_preset=args["style_preset"],
+            negative_prompt=args["negative_prompt"],
+            api_key=self._stability_api_key,
+        )
+        if not path.startswith("[ERROR]"):
+            await self._send_file_to_user(_RECIPIENT.get(), path, _CHANNEL.get())
+            return f"[OK] Image generated and sent"
+        return path
 
 
 # Global singleton
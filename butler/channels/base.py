@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 import abc
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Callable, Awaitable, Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class InboundMessage:
     """Normalized message arriving from any channel."""
     channel: str          # 'telegram' | 'whatsapp'
@@ -17,7 +18,7 @@ class InboundMessage:
     message_id: Optional[str] = None   # original message ID for dedup
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OutboundMessage:
     """Message to send back through a channel."""
     channel: str
@@ -31,6 +32,25 @@ class OutboundMessage:
 MessageHandler = Callable[[InboundMessage], Awaitable[None]]
 
 
+class RecentIds:
+    """Bounded record of recently seen message IDs, oldest evicted first."""
+
+    def __init__(self, maxlen: int = 512):
+        self._ids: OrderedDict[str, None] = OrderedDict()
+        self._maxlen = maxlen
+
+    def seen(self, message_id: Optional[str]) -> bool:
+        """Return True if message_id was already recorded; record it if not."""
+        if message_id is None:
+            return False
+        if message_id in self._ids:
+            return True
+        self._ids[message_id] = None
+        if len(self._ids) > self._maxlen:
+            self._ids.popitem(last=False)
+        return False
+
+
 class BaseChannel(abc.ABC):
     """Abstract base for messaging channel adapters."""
 
@@ -1,11 +1,13 @@
 """Telegram channel adapter using python-telegram-bot v21+."""
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from pathlib import Path
 from typing import Optional
 
+import aiohttp
 from telegram import Update, Bot
 from telegram.ext import (
     Application,
@@ -14,10 +16,13 @@ from telegram.ext import (
     ContextTypes,
 )
 
-from .base import BaseChannel, InboundMessage, OutboundMessage, MessageHandler as MsgHandler
+from .base import BaseChannel, InboundMessage, OutboundMessage, MessageHandler as MsgHandler, RecentIds
 
 logger = logging.getLogger(__name__)
 
+# Media downloads are streamed to disk in pieces of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class TelegramChannel(BaseChannel):
     """Polls Telegram for messages, calls on_message callback."""
@@ -28,6 +33,9 @@ class TelegramChannel(BaseChannel):
         self._media_dir.mkdir(parents=True, exist_ok=True)
         self._app: Optional[Application] = None
         self._on_message: Optional[MsgHandler] = None
+        self._seen_ids = RecentIds()
+        # Shared by media downloads so each one reuses pooled connections
+        self._http: Optional[aiohttp.ClientSession] = None
 
     @property
     def channel_name(self) -> str:
@@ -36,6 +44,7 @@ class TelegramChannel(BaseChannel):
     async def start(self, on_message: MsgHandler) -> None:
         self._on_message = on_message
         self._app = Application.builder().token(self._token).build()
+        self._http = aiohttp.ClientSession()
 
         # Register handler for text + media messages (not commands)
         self._app.add_handler(
@@ -55,6 +64,10 @@ class TelegramChannel(BaseChannel):
             return
 
         msg = update.message
+        # Message IDs are only unique within a chat. Checked before the media
+        # download so a redelivered update costs nothing.
+        if self._seen_ids.seen(f"{msg.chat_id}:{msg.message_id}"):
+            return
         user = msg.from_user
         sender_id = str(user.id) if user else "unknown"
         sender_name = user.full_name if user else "Unknown"
@@ -80,7 +93,7 @@ class TelegramChannel(BaseChannel):
 
             if file_obj:
                 dest = self._media_dir / f"tg_{msg.message_id}.{ext}"
-                await file_obj.download_to_drive(str(dest))
+                await self._download(file_obj, dest)
                 media_path = str(dest)
         except Exception as e:
             logger.warning("Failed to download media: %s", e)
@@ -99,6 +112,21 @@ class TelegramChannel(BaseChannel):
         except Exception as e:
             logger.error("Error in on_message handler: %s", e, exc_info=True)
 
+    async def _download(self, file_obj, dest: Path) -> None:
+        """Stream a file to disk rather than buffering all of it in memory first."""
+        url = file_obj.file_path or ""
+        if not url.startswith(("http://", "https://")) or not self._http:
+            # e.g. a local Bot API server hands out filesystem paths
+            await file_obj.download_to_drive(str(dest))
+            return
+        async with self._http.get(url, timeout=aiohttp.ClientTimeout(total=120)) as resp:
+            # Not raise_for_status(): its message would carry the URL, which embeds the bot token
+            if resp.status != 200:
+                raise RuntimeError(f"download failed with HTTP {resp.status}")
+            with open(dest, "wb") as f:
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
     async def send(self, message: OutboundMessage) -> None:
         if not self._app:
             raise RuntimeError("TelegramChannel not started")
@@ -110,15 +138,21 @@ class TelegramChannel(BaseChannel):
         text = message.text or ""
         if message.media_path:
             path = Path(message.media_path)
-            if path.exists():
-                with open(path, "rb") as f:
-                    await bot.send_document(chat_id=chat_id, document=f, caption=text[:1024] or None)
+            # Read off the event loop; PTB would read a handle or Path synchronously.
+            # A missing file falls through to sending the text alone.
+            try:
+                data = await asyncio.to_thread(path.read_bytes)
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                await bot.send_document(
+                    chat_id=chat_id, document=data, filename=path.name, caption=text[:1024] or None
+                )
                 return
 
-        # Chunk text if needed
-        chunks = [text[i:i+4096] for i in range(0, max(len(text), 1), 4096)]
-        for chunk in chunks:
-            await bot.send_message(chat_id=chat_id, text=chunk, parse_mode=None)
+        # Chunk text if needed; each slice is taken only when it is sent
+        for i in range(0, max(len(text), 1), 4096):
+            await bot.send_message(chat_id=chat_id, text=text[i:i+4096], parse_mode=None)
 
     async def send_typing(self, recipient_id: str) -> None:
         if not self._app:
@@ -135,3 +169,6 @@ class TelegramChannel(BaseChannel):
             await self._app.stop()
             await self._app.shutdown()
             self._app = None
+        if self._http:
+            await self._http.close()
+            self._http = None
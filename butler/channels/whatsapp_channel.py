@@ -4,17 +4,33 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import os
+import re
 import sys
 from pathlib import Path
 from typing import Optional
 
 import aiohttp
 
-from .base import BaseChannel, InboundMessage, OutboundMessage, MessageHandler
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+from .base import BaseChannel, InboundMessage, OutboundMessage, MessageHandler, RecentIds
 
 logger = logging.getLogger(__name__)
 
+# Bodies are pre-encoded with _json_dumps, so aiohttp's json= (stdlib) is bypassed
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# The data lines of one SSE frame, in one scan. Other fields (event:, id:,
+# retry:) and ":" comments don't match and are dropped; the bridge only
+# sends data.
+_SSE_DATA = re.compile(rb"^data: ?(.*?)\r?$", re.M)
+
 
 class WhatsAppChannel(BaseChannel):
     """Manages the Node.js whatsapp-web.js bridge process and consumes its SSE stream."""
@@ -30,7 +46,7 @@ class WhatsAppChannel(BaseChannel):
         self._port = port
         self._session_dir = session_dir
         self._node_path = node_path
-        self._bridge_script = bridge_script
+        self._bridge_script = Path(bridge_script).resolve()
         self._media_dir = Path(media_dir)
         self._media_dir.mkdir(parents=True, exist_ok=True)
 
@@ -38,6 +54,8 @@ class WhatsAppChannel(BaseChannel):
         self._session: Optional[aiohttp.ClientSession] = None
         self._sse_task: Optional[asyncio.Task] = None
         self._on_message: Optional[MessageHandler] = None
+        # An SSE reconnect can replay events the bridge already sent
+        self._seen_ids = RecentIds()
         self._base_url = f"http://127.0.0.1:{port}"
 
     @property
@@ -47,17 +65,19 @@ class WhatsAppChannel(BaseChannel):
     async def start(self, on_message: MessageHandler) -> None:
         self._on_message = on_message
         await self._start_bridge()
+        # One session for everything: the health poll's keep-alive connection
+        # to the bridge is reused by the SSE stream and later sends
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=8))
         await self._wait_for_bridge()
-        self._session = aiohttp.ClientSession()
         self._sse_task = asyncio.create_task(self._consume_sse(), name="wa-sse")
         logger.info("WhatsApp channel started (bridge on port %d)", self._port)
 
     async def _start_bridge(self) -> None:
-        script = Path(self._bridge_script).resolve()
+        script = self._bridge_script
         if not script.exists():
             raise FileNotFoundError(f"WhatsApp bridge script not found: {script}")
 
-        env = os.environ.copy()
+        # env left unset: the bridge inherits our environment as is
         self._process = await asyncio.create_subprocess_exec(
             self._node_path,
             str(script),
@@ -65,7 +85,6 @@ class WhatsAppChannel(BaseChannel):
             "--session-dir", self._session_dir,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.STDOUT,
-            env=env,
         )
         logger.info("WhatsApp bridge process started (PID %d)", self._process.pid)
         # Forward bridge stdout to our logger
@@ -75,27 +94,25 @@ class WhatsAppChannel(BaseChannel):
         """Forward bridge stdout directly to the terminal (preserves QR code rendering)."""
         if not self._process or not self._process.stdout:
             return
-        import sys
-        async for line in self._process.stdout:
-            text = line.decode(errors="replace")
-            # Print directly so QR ASCII art renders correctly in the terminal
-            sys.stdout.write(text)
-            sys.stdout.flush()
+        # Raw bytes straight through (QR ASCII art renders unchanged), one
+        # write and flush per chunk rather than a decode and flush per line
+        out = sys.stdout.buffer
+        while chunk := await self._process.stdout.read(4096):
+            out.write(chunk)
+            out.flush()
 
     async def _wait_for_bridge(self, timeout: float = 30.0) -> None:
         """Poll /health until bridge is up."""
-        deadline = asyncio.get_event_loop().time() + timeout
-        connector = aiohttp.TCPConnector()
-        async with aiohttp.ClientSession(connector=connector) as sess:
-            while asyncio.get_event_loop().time() < deadline:
-                try:
-                    async with sess.get(f"{self._base_url}/health", timeout=aiohttp.ClientTimeout(total=2)) as r:
-                        if r.status == 200:
-                            logger.info("WhatsApp bridge is up")
-                            return
-                except Exception:
-                    pass
-                await asyncio.sleep(1)
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            try:
+                async with self._session.get(f"{self._base_url}/health", timeout=aiohttp.ClientTimeout(total=2)) as r:
+                    if r.status == 200:
+                        logger.info("WhatsApp bridge is up")
+                        return
+            except Exception:
+                pass
+            await asyncio.sleep(1)
         raise TimeoutError("WhatsApp bridge did not start within timeout")
 
     async def _consume_sse(self) -> None:
@@ -106,16 +123,19 @@ class WhatsAppChannel(BaseChannel):
                 async with self._session.get(
                     f"{self._base_url}/events",
                     timeout=aiohttp.ClientTimeout(total=None, connect=10),
-                    headers={"Accept": "text/event-stream"},
+                    headers={"Accept": "text/event-stream", "Cache-Control": "no-cache"},
+                    auto_decompress=False,  # the bridge never compresses the stream
                 ) as resp:
                     logger.info("SSE stream connected")
                     retry_delay = 2.0
-                    async for line in resp.content:
-                        text = line.decode().strip()
-                        if text.startswith("data:"):
-                            payload = text[5:].strip()
-                            if payload:
-                                await self._handle_event(json.loads(payload))
+                    # One read per event (events end with a blank line). Frames
+                    # stay bytes: both JSON parsers take UTF-8 directly, and
+                    # ":" heartbeats are skipped undecoded.
+                    while not resp.content.at_eof():
+                        frame = await resp.content.readuntil(b"\n\n")
+                        payload = b"\n".join(_SSE_DATA.findall(frame))
+                        if payload:
+                            await self._handle_event(_json_loads(payload))
             except asyncio.CancelledError:
                 return
             except Exception as e:
@@ -132,7 +152,7 @@ class WhatsAppChannel(BaseChannel):
         elif etype == "disconnected":
             logger.warning("WhatsApp disconnected: %s", event.get("reason"))
         elif etype == "message":
-            if not self._on_message:
+            if not self._on_message or self._seen_ids.seen(event.get("id")):
                 return
             inbound = InboundMessage(
                 channel="whatsapp",
@@ -155,10 +175,11 @@ class WhatsAppChannel(BaseChannel):
             payload["media_path"] = message.media_path
         async with self._session.post(
             f"{self._base_url}/send",
-            json=payload,
+            data=_json_dumps(payload),
+            headers=_JSON_HEADERS,
             timeout=aiohttp.ClientTimeout(total=30),
         ) as resp:
-            data = await resp.json()
+            data = _json_loads(await resp.read())
             if not data.get("ok"):
                 raise RuntimeError(f"Bridge send failed: {data.get('error')}")
 
@@ -168,7 +189,8 @@ class WhatsAppChannel(BaseChannel):
         try:
             await self._session.post(
                 f"{self._base_url}/send-typing",
-                json={"to": recipient_id},
+                data=_json_dumps({"to": recipient_id}),
+                headers=_JSON_HEADERS,
                 timeout=aiohttp.ClientTimeout(total=5),
             )
         except Exception as e:
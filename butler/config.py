@@ -4,18 +4,54 @@ from __future__ import annotations
 import logging
 import os
 import subprocess
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader   # libyaml-backed
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# PyObjC (macOS only): query the Keychain in-process rather than through a
+# `security` subprocess per secret
+try:
+    import Security
+except ImportError:
+    Security = None
+
 logger = logging.getLogger(__name__)
 
 _KEYCHAIN_MARKER = "keychain:"
 
+_ERR_SEC_ITEM_NOT_FOUND = -25300
+
+# Config.get cache entry for a key path that isn't set
+_MISSING = object()
+
 
 def _keychain_get(service: str, account: str) -> str | None:
     """Fetch a secret from macOS Keychain."""
+    if Security is not None:
+        try:
+            status, data = Security.SecItemCopyMatching({
+                Security.kSecClass: Security.kSecClassGenericPassword,
+                Security.kSecAttrService: service,
+                Security.kSecAttrAccount: account,
+                Security.kSecReturnData: True,
+                Security.kSecMatchLimit: Security.kSecMatchLimitOne,
+            }, None)
+            if status == 0 and data is not None:   # errSecSuccess
+                return bytes(data).decode().strip()
+            if status == _ERR_SEC_ITEM_NOT_FOUND:
+                return None
+            # Anything else is most likely the item's ACL, which trusts only
+            # the `security` tool it was added with: fall back to that
+            logger.debug("SecItemCopyMatching returned %d; trying `security`", status)
+        except Exception as e:
+            logger.debug("Keychain lookup via Security framework failed: %s", e)
     try:
         result = subprocess.run(
             ["security", "find-generic-password", "-s", service, "-a", account, "-w"],
@@ -30,129 +66,157 @@ def _keychain_get(service: str, account: str) -> str | None:
     return None
 
 
-def _resolve_secrets(obj: Any) -> Any:
-    """Recursively resolve keychain: references in config values."""
+def _resolve_secrets(obj: Any, found: dict[tuple[str, str], str] | None = None) -> Any:
+    """Recursively resolve keychain: references in config values.
+
+    found maps (service, account) to the value already resolved in this walk,
+    so a secret referenced from several places costs one `security` call.
+    """
+    if found is None:
+        found = {}
     if isinstance(obj, str):
         if obj.startswith(_KEYCHAIN_MARKER):
             spec = obj[len(_KEYCHAIN_MARKER):].strip()
             parts = spec.split(":", 1)
             service = parts[0].strip()
             account = parts[1].strip() if len(parts) > 1 else service
+            if (service, account) in found:
+                return found[service, account]
             secret = _keychain_get(service, account)
             if secret:
                 logger.debug("Resolved Keychain secret for service=%s account=%s", service, account)
-                return secret
             else:
                 logger.warning("Keychain secret not found: service=%s account=%s", service, account)
-                return ""
+                secret = ""
+            found[service, account] = secret
+            return secret
         return obj
     elif isinstance(obj, dict):
-        return {k: _resolve_secrets(v) for k, v in obj.items()}
+        return {k: _resolve_secrets(v, found) for k, v in obj.items()}
     elif isinstance(obj, list):
-        return [_resolve_secrets(v) for v in obj]
+        return [_resolve_secrets(v, found) for v in obj]
     return obj
 
 
 class Config:
-    """Loaded, validated configuration."""
+    """Loaded, validated configuration.
+
+    The accessors below are cached_property: the config is never changed after
+    loading, so each is computed on first use and is a plain attribute after.
+    """
 
     def __init__(self, raw: dict):
         self._raw = raw
+        # keys tuple → value found, or _MISSING; the config is never mutated
+        # after loading, so entries never go stale
+        self._cache: dict[tuple, Any] = {}
 
     def get(self, *keys, default=None):
         """Navigate nested keys: cfg.get('email', 'imap', 'host')"""
-        obj = self._raw
-        for key in keys:
-            if not isinstance(obj, dict):
-                return default
-            obj = obj.get(key, None)
-            if obj is None:
-                return default
-        return obj
+        obj = self._cache.get(keys, _MISSING)
+        if obj is _MISSING:
+            obj = self._raw
+            for key in keys:
+                obj = obj.get(key) if isinstance(obj, dict) else None
+                if obj is None:
+                    obj = _MISSING
+                    break
+            self._cache[keys] = obj
+        # The default is applied per call, not cached, so callers passing
+        # different defaults for the same keys each get their own
+        return default if obj is _MISSING else obj
 
     # ── Convenience accessors ─────────────────────────────────────────────
 
-    @property
+    @cached_property
     def telegram_token(self) -> str:
         return self.get("telegram", "bot_token", default="")
 
-    @property
+    @cached_property
     def telegram_enabled(self) -> bool:
         return bool(self.get("telegram", "enabled", default=True))
 
-    @property
+    @cached_property
     def whatsapp_enabled(self) -> bool:
         return bool(self.get("whatsapp", "enabled", default=False))
 
-    @property
+    @cached_property
     def whatsapp_port(self) -> int:
         return int(self.get("whatsapp", "bridge", "port", default=8765))
 
-    @property
+    @cached_property
     def whatsapp_session_dir(self) -> str:
         return self.get("whatsapp", "bridge", "session_dir", default="./data/sessions")
 
-    @property
+    @cached_property
     def whatsapp_node_path(self) -> str:
         return self.get("whatsapp", "bridge", "node_path", default="node")
 
-    @property
+    @cached_property
     def anthropic_api_key(self) -> str:
         return self.get("anthropic", "api_key", default="")
 
-    @property
+    @cached_property
     def anthropic_model(self) -> str:
         return self.get("anthropic", "model", default="claude-sonnet-4-6")
 
-    @property
+    @cached_property
     def anthropic_max_tokens(self) -> int:
         return int(self.get("anthropic", "max_tokens", default=4096))
 
-    @property
+    @cached_property
     def history_token_budget(self) -> int:
         return int(self.get("anthropic", "history_token_budget", default=100_000))
 
-    @property
+    @cached_property
     def history_keep_recent(self) -> int:
         return int(self.get("anthropic", "history_keep_recent", default=10))
 
-    @property
+    @cached_property
     def cli_timeout(self) -> float:
         return float(self.get("anthropic", "cli_timeout", default=3600))
 
-    @property
-    def authorized_telegram_ids(self) -> list:
-        return self.get("security", "authorized_senders", "telegram", default=[])
+    @cached_property
+    def max_concurrent(self) -> int:
+        return int(self.get("anthropic", "max_concurrent", default=4))
 
-    @property
-    def authorized_whatsapp_phones(self) -> list:
-        return self.get("security", "authorized_senders", "whatsapp", default=[])
+    @cached_property
+    def max_queued_per_sender(self) -> int:
+        return int(self.get("anthropic", "max_queued_per_sender", default=3))
 
-    @property
+    @cached_property
+    def authorized_telegram_ids(self) -> frozenset[str]:
+        return frozenset(str(x) for x in self.get("security", "authorized_senders", "telegram", default=[]))
+
+    @cached_property
+    def authorized_whatsapp_phones(self) -> frozenset[str]:
+        return frozenset(str(x) for x in self.get("security", "authorized_senders", "whatsapp", default=[]))
+
+    @cached_property
     def rate_limit_per_minute(self) -> int:
         return int(self.get("security", "rate_limit", "messages_per_minute", default=10))
 
-    @property
+    @cached_property
     def rate_limit_burst(self) -> int:
         return int(self.get("security", "rate_limit", "burst", default=3))
 
-    @property
+    @cached_property
     def approval_timeout(self) -> float:
         return float(self.get("permissions", "approval_timeout", default=60))
 
-    @property
+    @cached_property
     def db_path(self) -> str:
         return self.get("paths", "db_path", default="./data/butler.db")
 
-    @property
+    @cached_property
     def media_dir(self) -> str:
         return self.get("paths", "media_dir", default="./data/media")
 
-    @property
+    @cached_property
     def log_dir(self) -> str:
         return self.get("paths", "log_dir", default="./logs")
 
-    @property
+    @cached_property
     def email_enabled(self) -> bool:
         if not self.get("email", "enabled", default=False):
             return False
@@ -161,7 +225,7 @@ class Config:
             return True
         return bool(self.get("email", "imap", default={}))
 
-    @property
+    @cached_property
     def email_accounts(self) -> dict:
         """Return dict of account_name → {imap: {...}, smtp: {...}}.
 
@@ -180,7 +244,7 @@ class Config:
             return {"default": {"imap": imap, "smtp": smtp}}
         return {}
 
-    @property
+    @cached_property
     def email_imap(self) -> dict:
         """Legacy accessor — returns the first/only account's IMAP config."""
         accounts = self.email_accounts
@@ -188,7 +252,7 @@ class Config:
             return next(iter(accounts.values())).get("imap", {})
         return {}
 
-    @property
+    @cached_property
     def email_smtp(self) -> dict:
         """Legacy accessor — returns the first/only account's SMTP config."""
         accounts = self.email_accounts
@@ -196,35 +260,48 @@ class Config:
             return next(iter(accounts.values())).get("smtp", {})
         return {}
 
-    @property
+    @cached_property
     def browser_enabled(self) -> bool:
         return bool(self.get("browser", "enabled", default=True))
 
-    @property
+    @cached_property
     def browser_user_data_dir(self) -> str:
         return self.get("browser", "user_data_dir", default="./data/browser_profile")
 
-    @property
+    @cached_property
     def browser_headless(self) -> bool:
         return bool(self.get("browser", "headless", default=True))
 
-    @property
+    @cached_property
     def log_level(self) -> str:
         return self.get("logging", "level", default="INFO").upper()
 
 
+# (resolved path, mtime_ns) → Config. In-process only: a file cache would
+# hold the resolved Keychain secrets in plaintext.
+_CFG_CACHE: dict[tuple[str, int], Config] = {}
+
+
 def load_config(path: str = "config/butler.yaml") -> Config:
     """Load and return configuration from YAML file."""
     p = Path(path)
-    if not p.exists():
+    try:
+        key = (str(p.resolve()), p.stat().st_mtime_ns)
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"Config file not found: {path}\n"
             f"Copy config/butler.yaml.example to config/butler.yaml and fill in your values."
-        )
+        ) from None
+
+    # Unchanged since the last load: skip the YAML parse and Keychain lookups
+    cfg = _CFG_CACHE.get(key)
+    if cfg is not None:
+        return cfg
 
     with open(p, "r") as f:
-        raw = yaml.safe_load(f) or {}
+        raw = yaml.load(f, Loader=_YamlLoader) or {}
 
     raw = _resolve_secrets(raw)
     logger.info("Config loaded from %s", path)
-    return Config(raw)
+    cfg = _CFG_CACHE[key] = Config(raw)
+    return cfg
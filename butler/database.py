@@ -1,6 +1,8 @@
 """Database initialization and schema management."""
 import aiosqlite
 import logging
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -18,8 +20,10 @@ CREATE TABLE IF NOT EXISTS messages (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
     conversation_id TEXT NOT NULL REFERENCES conversations(id),
     role            TEXT NOT NULL,       -- 'user' | 'assistant' | 'tool_result'
-    content         TEXT NOT NULL,       -- JSON-encoded content block(s)
+    content         TEXT NOT NULL,       -- raw text or JSON-encoded content blocks
     tokens          INTEGER DEFAULT 0,
+    kind            TEXT NOT NULL DEFAULT 'text',  -- 'text' | 'tool_use' | 'tool_result'
+    content_format  INTEGER NOT NULL DEFAULT 1,    -- 0 = raw text, 1 = JSON blocks
     created_at      REAL NOT NULL
 );
 
@@ -67,22 +71,197 @@ CREATE TABLE IF NOT EXISTS user_memory (
     UNIQUE(sender_id, channel, key) ON CONFLICT REPLACE
 );
 
-CREATE INDEX IF NOT EXISTS idx_messages_conv ON messages(conversation_id, created_at);
+-- Running totals kept by ConversationHistory as messages are written
+CREATE TABLE IF NOT EXISTS conversation_stats (
+    conversation_id TEXT PRIMARY KEY REFERENCES conversations(id),
+    token_total     INTEGER NOT NULL DEFAULT 0,
+    msg_count       INTEGER NOT NULL DEFAULT 0
+);
+
 CREATE INDEX IF NOT EXISTS idx_conv_sender ON conversations(sender_id, last_active);
 CREATE INDEX IF NOT EXISTS idx_audit_sender ON audit_log(sender_id, created_at);
-CREATE INDEX IF NOT EXISTS idx_summaries_conv ON summaries(conversation_id);
-CREATE INDEX IF NOT EXISTS idx_user_memory_sender ON user_memory(sender_id, channel);
 """
 
+# Indexes shaped after the hot queries, so each is an index range scan in
+# final order with no temp b-tree. (name, definition)
+INDEXES = [
+    # history window: WHERE conversation_id=? ORDER BY created_at, id, reading tokens.
+    # id breaks ties between turns written in one batch (same created_at).
+    ("idx_messages_conv_order", "messages(conversation_id, created_at, id, tokens)"),
+    # latest rolling summary: ORDER BY last_msg_id DESC LIMIT 1
+    ("idx_summaries_conv_last", "summaries(conversation_id, last_msg_id)"),
+    # memory block: ORDER BY updated_at DESC
+    ("idx_user_memory_lookup", "user_memory(sender_id, channel, updated_at DESC)"),
+]
+
+# Latest conversation for each (channel, sender_id) pair
+_NEWEST_CONVERSATION = (
+    "(SELECT k.id FROM conversations o JOIN conversations k "
+    "ON k.channel=o.channel AND k.sender_id=o.sender_id "
+    "WHERE o.id={col} ORDER BY k.last_active DESC LIMIT 1)"
+)
+
+# Unique indexes: (name, definition, statements removing existing duplicates)
+UNIQUE_INDEXES = [
+    # one summary per covered range; older releases could store the same
+    # range repeatedly, so keep only the newest copy before adding it
+    (
+        "idx_summaries_range",
+        "summaries(conversation_id, first_msg_id, last_msg_id)",
+        (
+            "DELETE FROM summaries WHERE id NOT IN "
+            "(SELECT MAX(id) FROM summaries GROUP BY conversation_id, first_msg_id, last_msg_id)",
+        ),
+    ),
+    # one perpetual conversation per user, the get_or_create upsert target.
+    # Stray duplicates from concurrent first messages are folded into the
+    # user's most recently active conversation.
+    (
+        "idx_conv_channel_sender",
+        "conversations(channel, sender_id)",
+        (
+            "UPDATE messages SET conversation_id=" + _NEWEST_CONVERSATION.format(col="messages.conversation_id"),
+            "UPDATE summaries SET conversation_id=" + _NEWEST_CONVERSATION.format(col="summaries.conversation_id"),
+            "DELETE FROM conversations WHERE id != " + _NEWEST_CONVERSATION.format(col="conversations.id"),
+        ),
+    ),
+]
+
+# Superseded by INDEXES / UNIQUE_INDEXES above
+DROPPED_INDEXES = [
+    "idx_messages_conv", "idx_messages_conv_time", "idx_summaries_conv", "idx_user_memory_sender",
+    "idx_conv_lookup",
+]
+
+# Applied on every open: WAL lets a commit cost one fdatasync of the log
+# instead of two fsyncs of the rollback journal + db file.
+PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+PRAGMA wal_autocheckpoint=1000;
+"""
+
+# Prepared statements kept per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Columns added after the first release: (table, column, declaration).
+# CREATE TABLE IF NOT EXISTS leaves existing tables alone, so these are
+# added to older databases on open.
+COLUMNS = [
+    ("messages", "kind", "TEXT NOT NULL DEFAULT 'text'"),
+    # Rows written before this column existed are all JSON
+    ("messages", "content_format", "INTEGER NOT NULL DEFAULT 1"),
+]
+
+
+async def _add_missing_columns(conn: aiosqlite.Connection) -> None:
+    for table, column, decl in COLUMNS:
+        async with conn.execute(f"PRAGMA table_info({table})") as cur:
+            existing = {row["name"] for row in await cur.fetchall()}
+        if column not in existing:
+            await conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+            logger.info("Added column %s.%s", table, column)
+
+
+async def _ensure_indexes(conn: aiosqlite.Connection) -> None:
+    """Create missing indexes; refresh planner statistics if any were added."""
+    async with conn.execute("SELECT name FROM sqlite_master WHERE type='index'") as cur:
+        existing = {row["name"] for row in await cur.fetchall()}
+    for name in DROPPED_INDEXES:
+        if name in existing:
+            await conn.execute(f"DROP INDEX {name}")
+    missing = [(name, on) for name, on in INDEXES if name not in existing]
+    for name, on in missing:
+        await conn.execute(f"CREATE INDEX {name} ON {on}")
+    for name, on, dedupe in UNIQUE_INDEXES:
+        if name not in existing:
+            for stmt in dedupe:
+                await conn.execute(stmt)
+            await conn.execute(f"CREATE UNIQUE INDEX {name} ON {on}")
+            missing.append((name, on))
+    if missing:
+        await conn.execute("ANALYZE")
+        logger.info("Created indexes: %s", ", ".join(name for name, _ in missing))
+
+
+# PRAGMA user_version after the one-time data migrations in init_db
+SCHEMA_VERSION = 1
+
+
+async def _fold_chunk_summaries(conn: aiosqlite.Connection) -> None:
+    """
+    Merge each conversation's summary rows into one covering their full range.
+
+    Summaries used to be independent, one row per evicted chunk, and all were
+    injected into context. The rolling summary folds each update into the
+    last, so only the newest row is read now.
+    """
+    async with conn.execute(
+        "SELECT conversation_id, content, first_msg_id, last_msg_id, created_at FROM summaries "
+        "WHERE conversation_id IN "
+        "(SELECT conversation_id FROM summaries GROUP BY conversation_id HAVING COUNT(*) > 1) "
+        "ORDER BY conversation_id, last_msg_id"
+    ) as cur:
+        rows = await cur.fetchall()
+    folded = []
+    for conv_id, group in groupby(rows, key=itemgetter("conversation_id")):
+        group = list(group)
+        folded.append((
+            conv_id,
+            "\n\n".join(row["content"] for row in group),
+            group[0]["first_msg_id"],
+            group[-1]["last_msg_id"],
+            max(row["created_at"] for row in group),
+        ))
+    if not folded:
+        return
+    await conn.executemany(
+        "DELETE FROM summaries WHERE conversation_id=?", [(row[0],) for row in folded]
+    )
+    await conn.executemany(
+        "INSERT INTO summaries (conversation_id, content, first_msg_id, last_msg_id, created_at) "
+        "VALUES (?,?,?,?,?)",
+        folded,
+    )
+    logger.info("Folded chunk summaries into one per conversation (%d conversations)", len(folded))
+
+
+async def _backfill_conversation_stats(conn: aiosqlite.Connection) -> None:
+    """Seed conversation_stats from the messages already stored."""
+    await conn.execute(
+        "INSERT OR REPLACE INTO conversation_stats (conversation_id, token_total, msg_count) "
+        "SELECT conversation_id, COALESCE(SUM(tokens), 0), COUNT(*) FROM messages GROUP BY conversation_id"
+    )
+    logger.info("Backfilled conversation_stats")
+
 
 async def init_db(db_path: str) -> aiosqlite.Connection:
     """Initialize database, create tables, return open connection."""
     path = Path(db_path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = await aiosqlite.connect(db_path)
+    conn = await aiosqlite.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = aiosqlite.Row
+    await conn.executescript(PRAGMAS)
+    async with conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='conversation_stats'"
+    ) as cur:
+        has_stats = await cur.fetchone() is not None
     await conn.executescript(SCHEMA)
+    await _add_missing_columns(conn)
+    await _ensure_indexes(conn)
+    # After _ensure_indexes, which may merge duplicate conversations
+    if not has_stats:
+        await _backfill_conversation_stats(conn)
+    async with conn.execute("PRAGMA user_version") as cur:
+        version = (await cur.fetchone())[0]
+    if version < 1:
+        await _fold_chunk_summaries(conn)
+    if version < SCHEMA_VERSION:
+        await conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
     await conn.commit()
     logger.info("Database initialized at %s", db_path)
     return conn
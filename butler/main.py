@@ -5,6 +5,7 @@ import asyncio
 import logging
 import signal
 import time
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
@@ -48,14 +49,13 @@ class Butler:
         self._auth: Optional[AuthGuard] = None
         self._rate_limiter: Optional[RateLimiter] = None
         self._channels: list[BaseChannel] = []
+        self._channel_by_name: dict[str, BaseChannel] = {}
         self._engine: Optional[AIEngine] = None
         self._history: Optional[ConversationHistory] = None
         # Per-user ApprovalManager instances
         self._approvers: dict[str, ApprovalManager] = {}
         # Per-user pending reply channel (to send approval requests back)
         self._user_channels: dict[str, tuple[str, str]] = {}  # sender_id → (channel, recipient_id)
-        # Dedup: set of recently seen message IDs
-        self._seen_ids: set[str] = set()
         self._shutdown_event = asyncio.Event()
         # Global browser lock — browser has one page, serialize browser-using tasks
         self._browser_lock = asyncio.Lock()
@@ -85,6 +85,8 @@ class Butler:
             max_tokens=cfg.anthropic_max_tokens,
             history=self._history,
             cli_timeout=cfg.cli_timeout,
+            max_concurrent=cfg.max_concurrent,
+            max_queued_per_sender=cfg.max_queued_per_sender,
         )
 
         # Email tools (optional, supports multiple named accounts)
@@ -137,6 +139,7 @@ class Butler:
         if not self._channels:
             logger.error("No channels configured! Enable telegram or whatsapp in butler.yaml")
             return
+        self._channel_by_name = {ch.channel_name: ch for ch in self._channels}
 
         # Start channels
         for ch in self._channels:
@@ -148,41 +151,43 @@ class Butler:
 
     def _get_approver(self, sender_id: str) -> ApprovalManager:
         """Get or create an ApprovalManager for this sender."""
-        if sender_id not in self._approvers:
-            async def _send_approval_msg(text: str):
-                info = self._user_channels.get(sender_id)
-                if not info:
-                    return
-                channel_name, recipient_id = info
-                for ch in self._channels:
-                    if ch.channel_name == channel_name:
-                        try:
-                            await ch.send(OutboundMessage(
-                                channel=channel_name,
-                                recipient_id=recipient_id,
-                                text=text,
-                            ))
-                        except Exception as e:
-                            logger.error("Failed to send approval msg: %s", e)
-                        break
-
-            self._approvers[sender_id] = ApprovalManager(
-                send_fn=_send_approval_msg,
+        approver = self._approvers.get(sender_id)
+        if approver is None:
+            approver = self._approvers[sender_id] = ApprovalManager(
+                send_fn=partial(self._send_approval_text, sender_id),
                 timeout=self._cfg.approval_timeout,
             )
-        return self._approvers[sender_id]
+        return approver
+
+    async def _send_approval_text(self, sender_id: str, text: str) -> None:
+        """Send an approval prompt to wherever sender_id last wrote from."""
+        info = self._user_channels.get(sender_id)
+        if not info:
+            return
+        channel_name, recipient_id = info
+        ch = self._channel_by_name.get(channel_name)
+        if not ch:
+            return
+        try:
+            await ch.send(OutboundMessage(
+                channel=channel_name,
+                recipient_id=recipient_id,
+                text=text,
+            ))
+        except Exception as e:
+            logger.error("Failed to send approval msg: %s", e)
 
     async def _send_file_to_user(self, recipient_id: str, path: str, channel: str) -> None:
-        for ch in self._channels:
-            if ch.channel_name == channel:
-                await ch.send(OutboundMessage(
-                    channel=channel,
-                    recipient_id=recipient_id,
-                    text="",
-                    media_path=path,
-                ))
-                return
-        logger.warning("No channel found to send file: %s", channel)
+        ch = self._channel_by_name.get(channel)
+        if not ch:
+            logger.warning("No channel found to send file: %s", channel)
+            return
+        await ch.send(OutboundMessage(
+            channel=channel,
+            recipient_id=recipient_id,
+            text="",
+            media_path=path,
+        ))
 
     async def _on_message(self, msg: InboundMessage) -> None:
         """Handle an inbound message from any channel."""
@@ -191,24 +196,17 @@ class Butler:
             logger.warning("Unauthorized sender: %s on %s", msg.sender_id, msg.channel)
             return
 
-        # Dedup
-        if msg.message_id and msg.message_id in self._seen_ids:
-            return
-        if msg.message_id:
-            self._seen_ids.add(msg.message_id)
-            # Keep dedup set bounded
-            if len(self._seen_ids) > 1000:
-                self._seen_ids = set(list(self._seen_ids)[-500:])
+        # Redelivered messages are already dropped by the channels
 
         # Rate limit
         if not await self._rate_limiter.is_allowed(msg.sender_id):
-            for ch in self._channels:
-                if ch.channel_name == msg.channel:
-                    await ch.send(OutboundMessage(
-                        channel=msg.channel,
-                        recipient_id=msg.sender_id,
-                        text="⚠️ You're sending messages too fast. Please slow down.",
-                    ))
+            ch = self._channel_by_name.get(msg.channel)
+            if ch:
+                await ch.send(OutboundMessage(
+                    channel=msg.channel,
+                    recipient_id=msg.sender_id,
+                    text="⚠️ You're sending messages too fast. Please slow down.",
+                ))
             return
 
         # Track user's channel for approval messages
@@ -220,7 +218,8 @@ class Butler:
             if approver.handle_reply(msg.text):
                 return  # message was an approval reply, don't process as a new request
 
-        # Spawn concurrent task — multiple requests can run in parallel
+        # Spawn concurrent task — requests run in parallel, within the
+        # engine's global and per-sender limits
         asyncio.create_task(
             self._process_message(msg),
             name=f"msg-{msg.channel}-{msg.sender_id}",
@@ -229,7 +228,7 @@ class Butler:
     async def _process_message(self, msg: InboundMessage) -> None:
         """Process a message: show typing → run AI → reply."""
         # Find the right channel
-        channel = next((ch for ch in self._channels if ch.channel_name == msg.channel), None)
+        channel = self._channel_by_name.get(msg.channel)
         if not channel:
             return
 
@@ -284,6 +283,18 @@ class Butler:
         except Exception:
             pass
 
+        if self._engine:
+            try:
+                await self._engine.close()
+            except Exception as e:
+                logger.error("Error closing AI engine: %s", e)
+
+        if self._history:
+            try:
+                await self._history.close()
+            except Exception as e:
+                logger.error("Error flushing history: %s", e)
+
         if self._db:
             await self._db.close()
 
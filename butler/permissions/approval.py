@@ -8,13 +8,30 @@ import time
 import uuid
 from typing import Callable, Awaitable, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .classifier import RiskLevel
 
 logger = logging.getLogger(__name__)
 
+
+def _args_json(args: dict) -> str:
+    """Compact JSON for the approval prompt; orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(args).decode()
+    return json.dumps(args, ensure_ascii=False, separators=(",", ":"))
+
 # Type: async function that sends a text message to the user
 SendFn = Callable[[str], Awaitable[None]]
 
+# Recognised replies to an approval prompt, after strip().lower()
+_YES_ALL = frozenset({"yes all", "yesall", "y all"})
+_YES = frozenset({"yes", "y", "approve", "ok", "yep", "sure"})
+_NO = frozenset({"no", "n", "deny", "cancel", "nope", "stop"})
+
 
 class ApprovalManager:
     """
@@ -56,7 +73,7 @@ class ApprovalManager:
         self._current_id = request_id
 
         # Format approval message
-        args_preview = json.dumps(args, ensure_ascii=False)
+        args_preview = _args_json(args)
         if len(args_preview) > 300:
             args_preview = args_preview[:297] + "..."
 
@@ -69,14 +86,17 @@ class ApprovalManager:
             f"_(Timeout in {int(self._timeout)}s)_"
         )
 
-        fut: asyncio.Future[bool] = asyncio.get_event_loop().create_future()
+        fut: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
         self._pending[request_id] = fut
 
         await self._send(msg)
 
+        # No shield: handle_reply skips a future that is already done, which
+        # includes one cancelled here on timeout
         try:
-            result = await asyncio.wait_for(asyncio.shield(fut), timeout=self._timeout)
-        except asyncio.TimeoutError:
+            async with asyncio.timeout(self._timeout):
+                result = await fut
+        except TimeoutError:
             logger.warning("Approval request %s timed out", request_id)
             self._pending.pop(request_id, None)
             if self._current_id == request_id:
@@ -96,7 +116,7 @@ class ApprovalManager:
         normalized = text.strip().lower()
 
         # Check for "yes all"
-        if normalized in ("yes all", "yesall", "y all"):
+        if normalized in _YES_ALL:
             self._yes_all = True
             # Approve any pending
             for fut in list(self._pending.values()):
@@ -106,8 +126,8 @@ class ApprovalManager:
             self._current_id = None
             return True
 
-        is_yes = normalized in ("yes", "y", "approve", "ok", "yep", "sure")
-        is_no = normalized in ("no", "n", "deny", "cancel", "nope", "stop")
+        is_yes = normalized in _YES
+        is_no = normalized in _NO
 
         if not (is_yes or is_no):
             return False
@@ -127,5 +147,10 @@ class ApprovalManager:
     def has_pending(self) -> bool:
         return bool(self._pending)
 
+    @property
+    def timeout(self) -> float:
+        """Seconds request_approval waits for a reply."""
+        return self._timeout
+
     def reset_yes_all(self) -> None:
         self._yes_all = False
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import re
 from enum import IntEnum
+from functools import lru_cache
+from itertools import groupby
 
 
 class RiskLevel(IntEnum):
@@ -22,11 +24,27 @@ class RiskLevel(IntEnum):
         }[self]
 
 
+# Rules of the form "A, later on the same line B" are written as
+# _LINE (?>.*?A) .* B rather than A.*B. They only try from line starts and
+# commit to the first A, so they stay linear in the command length. Plain
+# A.*B rescans the rest of the line from every A: quadratic, i.e. seconds
+# of blocked event loop on a long generated command.
+_LINE = r"(?:^|(?<=\n))"
+
+# Linear form of \bcp\s+.*\s+/ (same matches). Only the first cp on a line
+# and the last one (whose whitespace may run onto later lines) can decide it;
+# after cp's whitespace the "/" follows more whitespace, either on the same
+# line or after the line break.
+_CP_ABS_PATH = (
+    _LINE + r"(?:(?>.*?\bcp(?=\s))|(?>.*\bcp(?=\s)))"
+    r"\s(?:\s+/|(?>\s*)(?:.*\s/|.*\n\s*/))"
+)
+
 # Bash command patterns → risk level (patterns checked in order, first match wins)
 _BASH_RULES: list[tuple[re.Pattern, RiskLevel]] = [
     # CRITICAL — always block / always ask
     (re.compile(r"rm\s+-[rf]+\s*/\b|rm\s+--no-preserve-root"), RiskLevel.CRITICAL),
-    (re.compile(r":\(\)\s*\{.*\|.*\&"), RiskLevel.CRITICAL),          # fork bomb
+    (re.compile(_LINE + r"(?>.*?:\(\)\s*\{)(?>.*?\|).*\&"), RiskLevel.CRITICAL),  # fork bomb
     (re.compile(r"dd\s+if=/dev/(random|zero|urandom)"), RiskLevel.CRITICAL),
     (re.compile(r"\bmkfs\b|\bformat\b"), RiskLevel.CRITICAL),
     (re.compile(r">\s*/dev/sd[a-z]"), RiskLevel.CRITICAL),
@@ -35,17 +53,17 @@ _BASH_RULES: list[tuple[re.Pattern, RiskLevel]] = [
     (re.compile(r"\brm\s+(-[rf]+\s+)?\S"), RiskLevel.HIGH),           # any rm
     (re.compile(r"\bsudo\b|\bdoas\b"), RiskLevel.HIGH),
     (re.compile(r"\bchmod\s+[0-7]*[0-7][0-7][0-7]\b"), RiskLevel.HIGH),
-    (re.compile(r"\bcurl\b.*\|\s*(ba)?sh\b"), RiskLevel.HIGH),        # curl | bash
+    (re.compile(_LINE + r"(?>.*?\bcurl\b).*\|\s*(ba)?sh\b"), RiskLevel.HIGH),  # curl | bash
     (re.compile(r"\bkill\b|\bkillall\b"), RiskLevel.HIGH),
     (re.compile(r"\blaunchctl\s+(load|unload|bootstrap|bootout)\b"), RiskLevel.HIGH),
     (re.compile(r"\bsystemctl\s+(start|stop|restart|enable|disable)\b"), RiskLevel.HIGH),
     (re.compile(r"\bpkill\b"), RiskLevel.HIGH),
     (re.compile(r"\bcrontab\b"), RiskLevel.HIGH),
-    (re.compile(r"\bnetwork\b.*\bset\b|\bifconfig\b.*\bdown\b"), RiskLevel.HIGH),
+    (re.compile(_LINE + r"(?:(?>.*?\bnetwork\b).*\bset\b|(?>.*?\bifconfig\b).*\bdown\b)"), RiskLevel.HIGH),
 
     # MEDIUM
     (re.compile(r"\bmv\b"), RiskLevel.MEDIUM),
-    (re.compile(r"\bcp\s+.*\s+/"), RiskLevel.MEDIUM),
+    (re.compile(_CP_ABS_PATH), RiskLevel.MEDIUM),
     (re.compile(r"\bssh\b|\brsync\b|\bscp\b"), RiskLevel.MEDIUM),
     (re.compile(r"\bbrewup\b|\bbrew\s+(install|uninstall|upgrade)\b"), RiskLevel.MEDIUM),
     (re.compile(r"\bnpm\s+(install|uninstall)\b|\bpip\s+(install|uninstall)\b"), RiskLevel.MEDIUM),
@@ -61,6 +79,15 @@ _BASH_RULES: list[tuple[re.Pattern, RiskLevel]] = [
     (re.compile(r"^(ls|pwd|whoami|date|echo|cat|head|tail|grep|wc)\b"), RiskLevel.SAFE),
 ]
 
+# _BASH_RULES with each run of same-level rules merged into one alternation:
+# 5 searches instead of up to 27, same answer. Not one alternation over all
+# rules — that would pick the leftmost match in the command, not the first
+# rule in order ("ls; sudo reboot" would come out LOW).
+_BASH_LEVELS: list[tuple[re.Pattern, RiskLevel]] = [
+    (re.compile("|".join(f"(?:{p.pattern})" for p, _ in run)), level)
+    for level, run in groupby(_BASH_RULES, key=lambda rule: rule[1])
+]
+
 # Base risk for each tool (before arg-specific analysis)
 TOOL_BASE_RISKS: dict[str, RiskLevel] = {
     "bash": RiskLevel.MEDIUM,
@@ -99,9 +126,10 @@ TOOL_BASE_RISKS: dict[str, RiskLevel] = {
 }
 
 
+@lru_cache(maxsize=1024)  # the model often re-runs the same commands
 def classify_bash(command: str) -> RiskLevel:
     """Classify a bash command string into a RiskLevel."""
-    for pattern, level in _BASH_RULES:
+    for pattern, level in _BASH_LEVELS:
         if pattern.search(command):
             return level
     # Default: medium (unknown commands might be risky)
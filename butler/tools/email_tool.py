@@ -7,6 +7,7 @@ import imaplib
 import logging
 import smtplib
 import textwrap
+import time
 from email.message import EmailMessage
 from email.utils import parseaddr
 from typing import Optional
@@ -16,6 +17,17 @@ from ..permissions.approval import ApprovalManager
 
 logger = logging.getLogger(__name__)
 
+# How long a read waits for sibling reads to share its IMAP session
+READ_BATCH_DELAY = 0.005
+
+# Socket timeout for each IMAP operation. Executor threads can't be
+# cancelled, so this is what stops a hung server from holding one.
+IMAP_TIMEOUT = 20.0
+
+# Deadline for a whole SMTP send, kept below the email_send tool limit so
+# the thread gives up before dispatch() stops waiting for it
+SMTP_SEND_TIMEOUT = 30.0
+
 
 def _imap_list_emails(
     host: str,
@@ -27,7 +39,7 @@ def _imap_list_emails(
 ) -> str:
     """Synchronous IMAP fetch (runs in executor)."""
     try:
-        with imaplib.IMAP4_SSL(host, port) as conn:
+        with imaplib.IMAP4_SSL(host, port, timeout=IMAP_TIMEOUT) as conn:
             conn.login(username, password)
             conn.select(folder, readonly=True)
             _, data = conn.search(None, "ALL")
@@ -58,46 +70,73 @@ def _imap_list_emails(
         return f"[ERROR] IMAP list failed: {e}"
 
 
-def _imap_read_email(
+def _format_email(raw: bytes) -> str:
+    msg = email.message_from_bytes(raw)
+
+    from_ = msg.get("From", "?")
+    to = msg.get("To", "?")
+    subject = msg.get("Subject", "?")
+    date = msg.get("Date", "?")
+
+    body = ""
+    if msg.is_multipart():
+        for part in msg.walk():
+            if part.get_content_type() == "text/plain":
+                body = part.get_payload(decode=True).decode(errors="replace")
+                break
+    else:
+        body = msg.get_payload(decode=True).decode(errors="replace")
+
+    body = body.strip()
+    if len(body) > 4000:
+        body = body[:4000] + "\n…[truncated]"
+
+    return (
+        f"From: {from_}\nTo: {to}\nSubject: {subject}\nDate: {date}\n\n{body}"
+    )
+
+
+def _imap_read_emails(
     host: str,
     port: int,
     username: str,
     password: str,
-    message_id: str,
+    message_ids: list[str],
     folder: str = "INBOX",
-) -> str:
-    """Synchronous IMAP read (runs in executor)."""
+) -> dict[str, str]:
+    """
+    Synchronous IMAP read of several messages with one login and one FETCH
+    (runs in executor). Returns message_id → formatted message or error.
+    """
+    results: dict[str, str] = {}
+    wanted = {int(m): m for m in message_ids if m.isdigit()}
+    for m in message_ids:
+        if not m.isdigit():
+            results[m] = f"[ERROR] IMAP read failed: invalid message id {m!r}"
+    if not wanted:
+        return results
     try:
-        with imaplib.IMAP4_SSL(host, port) as conn:
+        with imaplib.IMAP4_SSL(host, port, timeout=IMAP_TIMEOUT) as conn:
             conn.login(username, password)
             conn.select(folder, readonly=True)
-            _, msg_data = conn.fetch(message_id.encode(), "(RFC822)")
-            raw = msg_data[0][1]
-            msg = email.message_from_bytes(raw)
-
-            from_ = msg.get("From", "?")
-            to = msg.get("To", "?")
-            subject = msg.get("Subject", "?")
-            date = msg.get("Date", "?")
-
-            body = ""
-            if msg.is_multipart():
-                for part in msg.walk():
-                    if part.get_content_type() == "text/plain":
-                        body = part.get_payload(decode=True).decode(errors="replace")
-                        break
-            else:
-                body = msg.get_payload(decode=True).decode(errors="replace")
-
-            body = body.strip()
-            if len(body) > 4000:
-                body = body[:4000] + "\n…[truncated]"
-
-            return (
-                f"From: {from_}\nTo: {to}\nSubject: {subject}\nDate: {date}\n\n{body}"
-            )
+            _, msg_data = conn.fetch(",".join(wanted.values()).encode(), "(RFC822)")
+            # One (b"<num> (RFC822 {size}", raw) tuple per message found
+            for part in msg_data:
+                if not isinstance(part, tuple):
+                    continue
+                m = wanted.get(int(part[0].split()[0]))
+                if m is None:
+                    continue
+                try:
+                    results[m] = _format_email(part[1])
+                except Exception as e:
+                    results[m] = f"[ERROR] IMAP read failed: {e}"
     except Exception as e:
-        return f"[ERROR] IMAP read failed: {e}"
+        for m in wanted.values():
+            results[m] = f"[ERROR] IMAP read failed: {e}"
+    for m in wanted.values():
+        results.setdefault(m, f"[ERROR] IMAP read failed: message {m} not found")
+    return results
 
 
 def _smtp_send(
@@ -110,7 +149,22 @@ def _smtp_send(
     subject: str,
     body: str,
 ) -> str:
-    """Synchronous SMTP send (runs in executor)."""
+    """
+    Synchronous SMTP send (runs in executor).
+
+    Every step shares one SMTP_SEND_TIMEOUT deadline. If the connection fails
+    once the message is being transmitted, the server may still have
+    accepted it, so that is reported as an unknown outcome, not a failure.
+    """
+    deadline = time.monotonic() + SMTP_SEND_TIMEOUT
+
+    def remaining() -> float:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError(f"gave up after {SMTP_SEND_TIMEOUT:g}s")
+        return left
+
+    sending = sent = False
     try:
         msg = EmailMessage()
         msg["From"] = from_address
@@ -118,25 +172,44 @@ def _smtp_send(
         msg["Subject"] = subject
         msg.set_content(body)
 
-        with smtplib.SMTP(host, port) as server:
+        with smtplib.SMTP(host, port, timeout=remaining()) as server:
             server.ehlo()
+            server.sock.settimeout(remaining())
             server.starttls()
+            server.sock.settimeout(remaining())
             server.login(username, password)
+            server.sock.settimeout(remaining())
+            sending = True
             server.send_message(msg)
-
-        logger.info("Email sent to %s: %s", to, subject)
-        return f"[OK] Email sent to {to}"
-    except Exception as e:
+            sent = True
+    except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+        # The server answered with a rejection, so nothing was sent
         return f"[ERROR] SMTP send failed: {e}"
+    except Exception as e:
+        if sending and not sent:
+            logger.warning("SMTP connection lost while sending to %s: %s", to, e)
+            return (
+                f"[UNKNOWN] The connection failed while sending to {to} ({e}); "
+                "the email may have been delivered. Check the Sent folder before retrying."
+            )
+        if not sent:
+            return f"[ERROR] SMTP send failed: {e}"
+        # Otherwise only the QUIT after the message was accepted failed
+
+    logger.info("Email sent to %s: %s", to, subject)
+    return f"[OK] Email sent to {to}"
 
 
 class EmailTool:
     def __init__(self, imap_cfg: dict, smtp_cfg: dict):
         self._imap = imap_cfg
         self._smtp = smtp_cfg
+        # folder → [(message_id, future)] waiting for _flush_reads
+        self._pending_reads: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
 
     async def list_emails(self, count: int = 10, folder: str = "INBOX") -> str:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             _imap_list_emails,
@@ -149,17 +222,35 @@ class EmailTool:
         )
 
     async def read_email(self, message_id: str, folder: str = "INBOX") -> str:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            _imap_read_email,
-            self._imap["host"],
-            self._imap["port"],
-            self._imap["username"],
-            self._imap["password"],
-            message_id,
-            folder,
-        )
+        """Read one message; reads issued together share one IMAP session and FETCH."""
+        fut = asyncio.get_running_loop().create_future()
+        self._pending_reads.setdefault(folder, []).append((message_id, fut))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_reads(), name="email-read")
+        return await fut
+
+    async def _flush_reads(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending_reads:
+            await asyncio.sleep(READ_BATCH_DELAY)
+            pending, self._pending_reads = self._pending_reads, {}
+            for folder, reads in pending.items():
+                try:
+                    results = await loop.run_in_executor(
+                        None,
+                        _imap_read_emails,
+                        self._imap["host"],
+                        self._imap["port"],
+                        self._imap["username"],
+                        self._imap["password"],
+                        list(dict.fromkeys(message_id for message_id, _ in reads)),
+                        folder,
+                    )
+                except Exception as e:
+                    results = {message_id: f"[ERROR] IMAP read failed: {e}" for message_id, _ in reads}
+                for message_id, fut in reads:
+                    if not fut.done():
+                        fut.set_result(results[message_id])
 
     async def send_email(
         self,
@@ -177,7 +268,7 @@ class EmailTool:
             if not approved:
                 return f"[DENIED] Sending email to {to!r} was denied."
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             _smtp_send,
@@ -108,7 +108,7 @@ async def generate_image(
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(
             None,
             _sync_generate,
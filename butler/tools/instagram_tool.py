@@ -214,7 +214,7 @@ async def instagram_get_messages(**kw) -> str:
 
 async def instagram_like(post_url: str, **kw) -> str:
     """Like an Instagram post. Risk: LOW (auto-approved)."""
-    kw.pop("approver", None)  # LOW risk — auto-approved; pop to avoid passing to _get_page
+    kw.pop("approver", None)  # LOW risk — auto-approved; tolerated for older callers
     try:
         page = await _get_page(**kw)
         await page.goto(post_url, wait_until="domcontentloaded", timeout=30000)
@@ -1,6 +1,6 @@
 """AuthGuard: sender allowlist checker."""
 import logging
-from typing import Set
+from typing import Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -8,10 +8,11 @@ logger = logging.getLogger(__name__)
 class AuthGuard:
     """Checks that incoming messages are from authorized senders."""
 
-    def __init__(self, telegram_ids: list[int | str], whatsapp_phones: list[str]):
-        self._telegram: Set[str] = {str(uid) for uid in telegram_ids}
+    def __init__(self, telegram_ids: Iterable[int | str], whatsapp_phones: Iterable[str]):
+        # Fixed for the process lifetime: frozensets, so each check is one hash lookup
+        self._telegram: frozenset[str] = frozenset(str(uid) for uid in telegram_ids)
         # Normalize E.164: keep only digits and leading +
-        self._whatsapp: Set[str] = {self._normalize_phone(p) for p in whatsapp_phones}
+        self._whatsapp: frozenset[str] = frozenset(self._normalize_phone(p) for p in whatsapp_phones)
         logger.info(
             "AuthGuard initialized: %d Telegram IDs, %d WhatsApp phones",
             len(self._telegram),
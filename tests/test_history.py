@@ -0,0 +1,70 @@
+"""Tests for ConversationHistory (run with: python -m unittest)."""
+import asyncio
+import os
+import tempfile
+import unittest
+from contextlib import asynccontextmanager
+
+from butler.ai.history import _SQL_LOAD_ALL, _SQL_LOAD_WINDOW, ConversationHistory
+from butler.database import init_db
+
+
+class _HoldAfterRead:
+    """Connection wrapper that pauses a message read after its rows are fetched."""
+
+    def __init__(self, db):
+        self._db = db
+        self.read_done = asyncio.Event()
+        self.release = asyncio.Event()
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def execute(self, sql, params=()):
+        if sql not in (_SQL_LOAD_ALL, _SQL_LOAD_WINDOW):
+            return self._db.execute(sql, params)
+        return self._held(sql, params)
+
+    @asynccontextmanager
+    async def _held(self, sql, params):
+        async with self._db.execute(sql, params) as cur:
+            yield cur
+        self.read_done.set()
+        await self.release.wait()
+
+
+class HistoryCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = await init_db(os.path.join(self._tmp.name, "butler.db"))
+        self.conn = _HoldAfterRead(self.db)
+        self.history = ConversationHistory(self.conn)
+        self.conv_id = await self.history.get_or_create("telegram", "42")
+
+    async def asyncTearDown(self):
+        await self.history.close()
+        await self.db.close()
+        self._tmp.cleanup()
+
+    async def test_append_during_load_is_not_lost(self):
+        await self.history.append(self.conv_id, "user", "first")
+
+        # load() has read the rows but not cached them when the append lands
+        load = asyncio.create_task(self.history.load(self.conv_id))
+        await self.conn.read_done.wait()
+        await self.history.append(self.conv_id, "assistant", "second")
+        self.conn.release.set()
+        await load
+
+        texts = [
+            block["text"]
+            for m in await self.history.load(self.conv_id)
+            for block in m["content"]
+            if block.get("type") == "text"
+        ]
+        self.assertIn("first", texts)
+        self.assertIn("second", texts)
+
+
+if __name__ == "__main__":
+    unittest.main()